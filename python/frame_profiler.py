@@ -0,0 +1,83 @@
+import csv
+import json
+import time
+from collections import deque
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[round(q * (len(ordered) - 1))]
+
+
+class FrameProfiler:
+    # call begin_frame(), then mark(phase) after each phase of work and
+    # end_frame() at the end; time between end_frame() and the next
+    # begin_frame() (sleeping) is not counted. Every frame is kept for
+    # export() only with keep_trace, otherwise just the rolling window.
+    def __init__(self, phases, window=240, keep_trace=False):
+        self.phases = list(phases)
+        self.columns = self.phases + ["frame"]
+        self.recent = {name: deque(maxlen=window) for name in self.columns}
+        self.keep_trace = keep_trace
+        self.trace = []
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.start = self.last = time.perf_counter()
+
+    def begin_frame(self):
+        self.start = self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        row = [self.current[phase] * 1000 for phase in self.phases]
+        row.append((self.last - self.start) * 1000)
+        for name, ms in zip(self.columns, row):
+            self.recent[name].append(ms)
+        if self.keep_trace:
+            self.trace.append(row)
+        for phase in self.phases:
+            self.current[phase] = 0.0
+
+    def stats(self):
+        # {name: (p50, p99)} in milliseconds over the rolling window
+        return {
+            name: (percentile(values, 0.5), percentile(values, 0.99))
+            for name, values in self.recent.items()
+        }
+
+    def summary(self):
+        return "  ".join(
+            "{} {:.2f}/{:.2f}".format(name, p50, p99)
+            for name, (p50, p99) in self.stats().items()
+        ) + "  ms p50/p99"
+
+    def export(self, path):
+        # the whole trace, one row per frame, as JSON or CSV by file extension
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"columns": self.columns, "unit": "ms", "frames": self.trace}, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(self.columns)
+                writer.writerows(self.trace)
+
+
+class NullProfiler:
+    # stands in for FrameProfiler when profiling is off
+    def begin_frame(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def export(self, path):
+        pass
@@ -1,5 +1,37 @@
+import argparse
+import asyncio
+import random
+import threading
+import time
+import tkinter.font
 import turtle
 
+import frame_profiler
+import pong_ai
+import pong_core
+import pong_net
+import pong_replay
+import replay_codec
+
+#timing
+PHYSICS_HZ = pong_core.TICK_HZ
+RENDER_HZ = 60
+TICK = 1.0 / PHYSICS_HZ
+FRAME = 1.0 / RENDER_HZ
+MAX_FRAME_TIME = 0.25
+
+#command line
+parser = argparse.ArgumentParser(description="Ping pong")
+parser.add_argument("--connect", metavar="HOST:PORT", help="play online on a pong_net.py server")
+parser.add_argument("--cpu", action="store_true", help="let the computer play the right paddle")
+parser.add_argument("--profile", action="store_true", help="show frame timings on screen")
+parser.add_argument("--profile-out", metavar="FILE", help="save the frame timings as .csv or .json")
+parser.add_argument("--seed", type=replay_codec.seed_arg, help="seed for the opening serve")
+parser.add_argument("--record", metavar="FILE", help="save a replay of this match")
+parser.add_argument("--replay", metavar="FILE", help="watch a saved replay")
+parser.add_argument("--speed", type=float, default=1.0, help="replay playback rate")
+args = parser.parse_args()
+
 wind = turtle.Screen()
 wind.title("Ping Pong")
 wind.bgcolor("black")
@@ -31,87 +63,208 @@ ball.shape("circle")
 ball.color("white")
 ball.penup()
 ball.goto(0, 0)
-ball.dx = 0.4
-ball.dy = 0.4
 
 #score
-score1 = 0
-score2 = 0
-score = turtle.Turtle()
-score.speed(0)
-score.color("white")
-score.penup()
-score.hideturtle()
-score.goto(0, 260)
-score.write("Player 1: 0 Player 2: 0", align="center", font=("Courier", 24, "normal"))
-
-#functions
-def madrab1_up():
-    y = madrab1.ycor()
-    y +=20
-    madrab1.sety(y)
-
-def madrab1_down():
-    y = madrab1.ycor()
-    y -=20
-    madrab1.sety(y)
-
-
-def madrab2_up():
-    y = madrab2.ycor()
-    y +=20
-    madrab2.sety(y)
-
-def madrab2_down():
-    y = madrab2.ycor()
-    y -=20
-    madrab2.sety(y)
+SCORE_FONT = ("Courier", 24, "normal")
+SCORE_DIGITS = 3
+
+class Scoreboard:
+    # the labels are written once and every digit has its own turtle,
+    # so a point only redraws the digits that changed
+    def __init__(self, x, y, font, digits):
+        self.font = font
+        self.digits = digits
+        self.shown = [" "] * (2 * digits)
+        self.slots = []
+
+        width = tkinter.font.Font(root=wind.getcanvas(), family=font[0], size=font[1]).measure("0")
+        parts = ["Player 1: ", None, " Player 2: ", None]
+        total = sum(len(part) if part else digits for part in parts) * width
+        left = x - total / 2
+
+        for part in parts:
+            if part is None:
+                for _ in range(digits):
+                    self.slots.append(self._pen(left, y))
+                    left += width
+            else:
+                self._pen(left, y).write(part, align="left", font=font)
+                left += len(part) * width
+
+    def _pen(self, x, y):
+        pen = turtle.Turtle()
+        pen.speed(0)
+        pen.color("white")
+        pen.penup()
+        pen.hideturtle()
+        pen.goto(x, y)
+        return pen
+
+    def show(self, score1, score2):
+        top = 10 ** self.digits - 1
+        text = str(min(score1, top)).ljust(self.digits) + str(min(score2, top)).ljust(self.digits)
+        for i, char in enumerate(text):
+            if char != self.shown[i]:
+                self.shown[i] = char
+                self.slots[i].clear()
+                if char != " ":
+                    self.slots[i].write(char, align="left", font=self.font)
+
+score = Scoreboard(0, 260, SCORE_FONT, SCORE_DIGITS)
+score.show(0, 0)
+
+#keyboard state
+KEYS = {
+    "w": pong_core.MADRAB1_UP,
+    "s": pong_core.MADRAB1_DOWN,
+    "Up": pong_core.MADRAB2_UP,
+    "m": pong_core.MADRAB2_DOWN,
+}
+held = 0
+
+def bind_key(key, bit):
+    def press():
+        global held
+        held |= bit
+
+    def release():
+        global held
+        held &= ~bit
+
+    wind.onkeypress(press, key)
+    wind.onkeyrelease(release, key)
 
 #keyboard bindings
 wind.listen()
-wind.onkeypress(madrab1_up, "w")
-wind.onkeypress(madrab1_down, "s")
+for key, bit in KEYS.items():
+    bind_key(key, bit)
+
+#profiling
+PROFILE_PHASES = ("input", "physics", "collision", "render", "update")
+OVERLAY_EVERY = 30
 
-wind.onkeypress(madrab2_up, "Up")
-wind.onkeypress(madrab2_down, "m")
+if args.profile or args.profile_out:
+    profiler = frame_profiler.FrameProfiler(PROFILE_PHASES, keep_trace=bool(args.profile_out))
+else:
+    profiler = frame_profiler.NullProfiler()
+
+overlay = turtle.Turtle()
+overlay.speed(0)
+overlay.color("gray")
+overlay.penup()
+overlay.hideturtle()
+overlay.goto(-390, -290)
+
+def show_profile(frame):
+    if args.profile and frame % OVERLAY_EVERY == 0:
+        overlay.clear()
+        overlay.write(profiler.summary(), align="left", font=("Courier", 9, "normal"))
+
+#drawing
+def render(state):
+    ball.goto(state.ball_x, state.ball_y)
+    madrab1.sety(state.madrab1_y)
+    madrab2.sety(state.madrab2_y)
+
+    score.show(state.score1, state.score2)
+
+def sleep_until_next_frame(start):
+    spare = FRAME - (time.perf_counter() - start)
+    if spare > 0:
+        time.sleep(spare)
 
 #main game loop
-while True:
-    wind.update()
-
-    #move the ball
-    ball.setx(ball.xcor() + ball.dx)
-    ball.sety(ball.ycor() + ball.dy)
-
-    #border checking
-    if ball.ycor() > 290:
-        ball.sety(290)
-        ball.dy *= -1
-
-    if ball.ycor() < -290:
-        ball.sety(-290)
-        ball.dy *= -1
-
-    if ball.xcor() > 390:
-        ball.goto(0, 0)
-        ball.dx *= -1
-        score1 += 1
-        score.clear()
-        score.write("Player 1: {} Player 2: {}".format(score1, score2), align="center", font=("Courier", 24, "normal"))
-
-    if ball.xcor() < -390:
-        ball.goto(0, 0)
-        ball.dx *= -1
-        score2 += 1
-        score.clear()
-        score.write("Player 1: {} Player 2: {}".format(score1, score2), align="center", font=("Courier", 24, "normal"))
-
-
-    # tasadom madrab and ball
-    if (340 < ball.xcor() < 350) and (madrab2.ycor() - 40 < ball.ycor() < madrab2.ycor() + 40):
-        ball.setx(340)
-        ball.dx *= -1
-
-    if (ball.xcor() < -340 and ball.xcor() > -350) and (ball.ycor() < madrab1.ycor() + 40 and ball.ycor() > madrab1.ycor() - 40):
-        ball.setx(-340)
-        ball.dx *= -1
\ No newline at end of file
+def play_local(state, recorder=None, cpu=None):
+    previous = time.perf_counter()
+    accumulator = 0.0
+    frame = 0
+    try:
+        while True:
+            now = time.perf_counter()
+            accumulator += min(now - previous, MAX_FRAME_TIME)
+            previous = now
+            profiler.begin_frame()
+
+            while accumulator >= TICK:
+                keys = held
+                if cpu is not None:
+                    keys = keys & (pong_core.MADRAB1_UP | pong_core.MADRAB1_DOWN) | cpu.keys(state)
+                if recorder is not None:
+                    recorder.record(keys)
+                profiler.mark("input")
+                pong_core.move_paddles(state, keys)
+                profiler.mark("physics")
+                pong_core.move_ball(state)
+                profiler.mark("collision")
+                accumulator -= TICK
+
+            render(state)
+            show_profile(frame)
+            profiler.mark("render")
+            wind.update()
+            profiler.mark("update")
+            profiler.end_frame()
+            frame += 1
+            sleep_until_next_frame(now)
+    finally:
+        # closing the window ends the loop, keep what was recorded
+        if recorder is not None:
+            recorder.save(args.record)
+        if args.profile_out:
+            profiler.export(args.profile_out)
+
+def play_replay(replay, speed):
+    seed, ticks, runs = replay
+    state = pong_core.PongState(seed)
+    keys = pong_replay.inputs(runs)
+    previous = time.perf_counter()
+    accumulator = 0.0
+    while state.tick < ticks:
+        now = time.perf_counter()
+        accumulator += min(now - previous, MAX_FRAME_TIME) * speed
+        previous = now
+
+        while accumulator >= TICK and state.tick < ticks:
+            pong_core.step(state, next(keys))
+            accumulator -= TICK
+
+        render(state)
+        wind.update()
+        sleep_until_next_frame(now)
+    turtle.done()
+
+def play_online(host, port):
+    # the server runs the match, this thread only draws what the client sees
+    client = pong_net.PongClient()
+    threading.Thread(target=asyncio.run, args=(client.run(host, port),), daemon=True).start()
+    while True:
+        now = time.perf_counter()
+
+        # either set of keys moves your own paddle
+        keys = 0
+        if held & (pong_core.MADRAB1_UP | pong_core.MADRAB2_UP):
+            keys |= pong_net.UP
+        if held & (pong_core.MADRAB1_DOWN | pong_core.MADRAB2_DOWN):
+            keys |= pong_net.DOWN
+        client.held = keys
+
+        render(client.view(now))
+        wind.update()
+        sleep_until_next_frame(now)
+
+if args.connect:
+    host, port = args.connect.rsplit(":", 1)
+    play_online(host, int(port))
+elif args.replay:
+    try:
+        replay = pong_replay.load(args.replay)
+    except ValueError as e:
+        parser.error("{}: {}".format(args.replay, e))
+    play_replay(replay, args.speed)
+else:
+    seed = args.seed if args.seed is not None else random.getrandbits(32)
+    play_local(
+        pong_core.PongState(seed),
+        pong_replay.Recorder(seed) if args.record else None,
+        pong_ai.CpuPaddle(2) if args.cpu else None,
+    )
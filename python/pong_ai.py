@@ -0,0 +1,41 @@
+from pong_core import (
+    MADRAB1_DOWN, MADRAB1_UP, MADRAB2_DOWN, MADRAB2_UP, PADDLE_FRONT,
+    PADDLE_SPEED, fold_y,
+)
+
+
+def intercept_y(x, y, dx, dy, side):
+    # where the ball will cross the face of the paddle on this side,
+    # unfolding its wall bounces instead of simulating them
+    face = PADDLE_FRONT if side == 2 else -PADDLE_FRONT
+    return fold_y(y + dy * (face - x) / dx)[0]
+
+
+class CpuPaddle:
+    # steers one paddle to where the ball will arrive; the target is only
+    # worked out again when the ball changes direction
+    def __init__(self, side=2):
+        self.side = side
+        self.up = MADRAB2_UP if side == 2 else MADRAB1_UP
+        self.down = MADRAB2_DOWN if side == 2 else MADRAB1_DOWN
+        self.heading = None
+        self.target = 0.0
+
+    def keys(self, state):
+        dx = state.ball_dx
+        dy = state.ball_dy
+        heading = (dx > 0, dy > 0)
+        if heading != self.heading:
+            self.heading = heading
+            coming = dx > 0 if self.side == 2 else dx < 0
+            if coming:
+                self.target = intercept_y(state.ball_x, state.ball_y, dx, dy, self.side)
+            else:
+                self.target = 0.0
+
+        y = state.madrab2_y if self.side == 2 else state.madrab1_y
+        if self.target > y + PADDLE_SPEED / 2:
+            return self.up
+        if self.target < y - PADDLE_SPEED / 2:
+            return self.down
+        return 0
@@ -0,0 +1,157 @@
+import time
+
+import numpy as np
+
+from pong_core import (
+    BALL_SPEED, GOAL_X, PADDLE_FRONT, PADDLE_LIMIT, PADDLE_REACH, PADDLE_SPEED, PADDLE_X,
+    WALL_Y, PongState, step as step_one,
+)
+
+
+def fold_y(y):
+    # array version of pong_core.fold_y
+    m = np.mod(y + WALL_Y, 4 * WALL_Y)
+    bounced = m > 2 * WALL_Y
+    return np.where(bounced, 3 * WALL_Y - m, m - WALL_Y), bounced
+
+
+def sweep_hit(x0, x1, y0, dx, dy, madrab_y):
+    # array version of pong_core.sweep_hit, only folding the few
+    # matches whose ball actually reaches the paddle this tick
+    hit = (x0 < PADDLE_X) & (x1 > PADDLE_FRONT) & (dx > 0)
+    idx = np.flatnonzero(hit)
+    if len(idx):
+        t = np.maximum(PADDLE_FRONT - x0[idx], 0.0) / dx[idx]
+        y_hit = fold_y(y0[idx] + dy[idx] * t)[0]
+        hit[idx] = np.abs(y_hit - madrab_y[idx]) < PADDLE_REACH
+    return hit
+
+
+class BatchCpu:
+    # pong_ai.CpuPaddle for every match at once; targets are only
+    # recomputed for matches whose ball changed direction this tick
+    def __init__(self, n, side=2):
+        self.side = side
+        self.face = PADDLE_FRONT if side == 2 else -PADDLE_FRONT
+        self.heading = np.full(n, -1, dtype=np.int8)
+        self.target = np.zeros(n)
+
+    def actions(self, batch):
+        dx = batch.ball_dx
+        dy = batch.ball_dy
+        heading = (dx > 0).astype(np.int8) * 2 + (dy > 0)
+        idx = np.flatnonzero(heading != self.heading)
+        if len(idx):
+            self.heading[idx] = heading[idx]
+            coming = dx[idx] > 0 if self.side == 2 else dx[idx] < 0
+            t = (self.face - batch.ball_x[idx]) / dx[idx]
+            y = fold_y(batch.ball_y[idx] + dy[idx] * t)[0]
+            self.target[idx] = np.where(coming, y, 0.0)
+
+        y = batch.madrab2_y if self.side == 2 else batch.madrab1_y
+        gap = self.target - y
+        return (gap > PADDLE_SPEED / 2).astype(np.int8) - (gap < -PADDLE_SPEED / 2)
+
+
+class PongBatch:
+    # every field is one array with an entry per match
+    def __init__(self, n):
+        self.n = n
+        self.reset()
+
+    def reset(self):
+        n = self.n
+        self.ball_x = np.zeros(n)
+        self.ball_y = np.zeros(n)
+        self.ball_dx = np.full(n, float(BALL_SPEED))
+        self.ball_dy = np.full(n, float(BALL_SPEED))
+        self.madrab1_y = np.zeros(n)
+        self.madrab2_y = np.zeros(n)
+        self.score1 = np.zeros(n, dtype=np.int32)
+        self.score2 = np.zeros(n, dtype=np.int32)
+        self.tick = 0
+
+    def state(self, i):
+        # copy match i out into a PongState
+        one = PongState()
+        one.ball_x = float(self.ball_x[i])
+        one.ball_y = float(self.ball_y[i])
+        one.ball_dx = float(self.ball_dx[i])
+        one.ball_dy = float(self.ball_dy[i])
+        one.madrab1_y = float(self.madrab1_y[i])
+        one.madrab2_y = float(self.madrab2_y[i])
+        one.score1 = int(self.score1[i])
+        one.score2 = int(self.score2[i])
+        one.tick = self.tick
+        return one
+
+    def step(self, actions=None):
+        # actions is an (n, 2) array of -1/0/1 paddle moves for madrab1/madrab2
+        # returns +1 where player 1 scored, -1 where player 2 scored, else 0
+        if actions is not None:
+            self.madrab1_y = np.clip(self.madrab1_y + actions[:, 0] * PADDLE_SPEED, -PADDLE_LIMIT, PADDLE_LIMIT)
+            self.madrab2_y = np.clip(self.madrab2_y + actions[:, 1] * PADDLE_SPEED, -PADDLE_LIMIT, PADDLE_LIMIT)
+
+        x0 = self.ball_x
+        y0 = self.ball_y
+        dx = self.ball_dx
+        dy = self.ball_dy
+        x = x0 + dx
+
+        #border checking
+        y, bounced = fold_y(y0 + dy)
+        new_dy = np.where(bounced, -dy, dy)
+
+        # tasadom madrab and ball
+        hit2 = sweep_hit(x0, x, y0, dx, dy, self.madrab2_y)
+        hit1 = sweep_hit(-x0, -x, y0, -dx, dy, self.madrab1_y)
+        hit = hit1 | hit2
+        x = np.where(hit2, PADDLE_FRONT, np.where(hit1, -PADDLE_FRONT, x))
+
+        goal1 = ~hit & (x > GOAL_X)
+        goal2 = ~hit & (x < -GOAL_X)
+        goal = goal1 | goal2
+        x = np.where(goal, 0.0, x)
+        y = np.where(goal, 0.0, y)
+        dx = np.where(hit | goal, -dx, dx)
+        dy = new_dy
+        self.score1 += goal1
+        self.score2 += goal2
+
+        self.ball_x = x
+        self.ball_y = y
+        self.ball_dx = dx
+        self.ball_dy = dy
+        self.tick += 1
+        return goal1.astype(np.int8) - goal2.astype(np.int8)
+
+
+if __name__ == "__main__":
+    n = 10000
+    ticks = 1000
+    batch = PongBatch(n)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(-1, 2, size=(ticks, n, 2)).astype(np.int8)
+
+    start = time.perf_counter()
+    for t in range(ticks):
+        batch.step(actions[t])
+    elapsed = time.perf_counter() - start
+    print("batch:  {:.0f} match-ticks/s".format(n * ticks / elapsed))
+
+    batch.reset()
+    cpu1 = BatchCpu(n, side=1)
+    cpu2 = BatchCpu(n, side=2)
+    start = time.perf_counter()
+    for t in range(ticks):
+        batch.step(np.stack((cpu1.actions(batch), cpu2.actions(batch)), axis=1))
+    elapsed = time.perf_counter() - start
+    print("cpu vs cpu: {:.0f} match-ticks/s, {} points scored".format(
+        n * ticks / elapsed, int(batch.score1.sum() + batch.score2.sum())))
+
+    one = PongState()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        step_one(one)
+    elapsed = time.perf_counter() - start
+    print("single: {:.0f} match-ticks/s".format(ticks / elapsed))
@@ -0,0 +1,138 @@
+import random
+import time
+
+#table layout
+WALL_Y = 290
+GOAL_X = 390
+PADDLE_X = 350
+PADDLE_FRONT = 340
+PADDLE_REACH = 40
+PADDLE_LIMIT = 250
+
+# pixels per physics tick
+PADDLE_SPEED = 8
+BALL_SPEED = 4
+
+#physics ticks per second
+TICK_HZ = 60
+
+#input bits, one per held key
+MADRAB1_UP = 1
+MADRAB1_DOWN = 2
+MADRAB2_UP = 4
+MADRAB2_DOWN = 8
+
+
+class PongState:
+    __slots__ = (
+        "ball_x", "ball_y", "ball_dx", "ball_dy",
+        "madrab1_y", "madrab2_y",
+        "score1", "score2", "tick",
+    )
+
+    def __init__(self, seed=None):
+        # a seed picks the direction of the opening serve
+        self.ball_x = 0.0
+        self.ball_y = 0.0
+        self.ball_dx = BALL_SPEED
+        self.ball_dy = BALL_SPEED
+        self.madrab1_y = 0.0
+        self.madrab2_y = 0.0
+        self.score1 = 0
+        self.score2 = 0
+        self.tick = 0
+
+        if seed is not None:
+            rng = random.Random(seed)
+            self.ball_dx = rng.choice((-BALL_SPEED, BALL_SPEED))
+            self.ball_dy = rng.choice((-BALL_SPEED, BALL_SPEED))
+
+
+def fold_y(y):
+    # unfold a y that went past the walls back onto the table,
+    # also telling whether it bounced an odd number of times
+    if -WALL_Y <= y <= WALL_Y:
+        return y, False
+    m = (y + WALL_Y) % (4 * WALL_Y)
+    if m > 2 * WALL_Y:
+        return 3 * WALL_Y - m, True
+    return m - WALL_Y, False
+
+
+def sweep_hit(x0, x1, y0, dx, dy, madrab_y):
+    # swept test of the ball path against the paddle box, with x mirrored
+    # so the paddle face is at +PADDLE_FRONT and the ball moves right
+    if x0 >= PADDLE_X or x1 <= PADDLE_FRONT:
+        return False
+    t = max(PADDLE_FRONT - x0, 0.0) / dx
+    y_hit = fold_y(y0 + dy * t)[0]
+    return abs(y_hit - madrab_y) < PADDLE_REACH
+
+
+def move_paddle(y, up, down):
+    if up:
+        y += PADDLE_SPEED
+    if down:
+        y -= PADDLE_SPEED
+    return max(-PADDLE_LIMIT, min(PADDLE_LIMIT, y))
+
+
+def move_paddles(state, keys):
+    if keys:
+        state.madrab1_y = move_paddle(state.madrab1_y, keys & MADRAB1_UP, keys & MADRAB1_DOWN)
+        state.madrab2_y = move_paddle(state.madrab2_y, keys & MADRAB2_UP, keys & MADRAB2_DOWN)
+
+
+def move_ball(state):
+    x0 = state.ball_x
+    y0 = state.ball_y
+    dx = state.ball_dx
+    dy = state.ball_dy
+    x = x0 + dx
+
+    #border checking
+    y, bounced = fold_y(y0 + dy)
+    if bounced:
+        state.ball_dy = -dy
+
+    # tasadom madrab and ball
+    if dx > 0 and sweep_hit(x0, x, y0, dx, dy, state.madrab2_y):
+        x = PADDLE_FRONT
+        state.ball_dx = -dx
+    elif dx < 0 and sweep_hit(-x0, -x, y0, -dx, dy, state.madrab1_y):
+        x = -PADDLE_FRONT
+        state.ball_dx = -dx
+
+    elif x > GOAL_X:
+        x = y = 0.0
+        state.ball_dx = -dx
+        state.score1 += 1
+
+    elif x < -GOAL_X:
+        x = y = 0.0
+        state.ball_dx = -dx
+        state.score2 += 1
+
+    state.ball_x = x
+    state.ball_y = y
+    state.tick += 1
+
+
+def step(state, keys=0):
+    move_paddles(state, keys)
+    move_ball(state)
+
+
+def run(state, ticks):
+    for _ in range(ticks):
+        step(state)
+    return state
+
+
+if __name__ == "__main__":
+    ticks = 1000000
+    start = time.perf_counter()
+    state = run(PongState(), ticks)
+    elapsed = time.perf_counter() - start
+    print("{} ticks in {:.2f}s ({:.0f} ticks/s), score {}-{}".format(
+        ticks, elapsed, ticks / elapsed, state.score1, state.score2))
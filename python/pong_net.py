@@ -0,0 +1,253 @@
+import argparse
+import asyncio
+import collections
+import random
+import struct
+import time
+
+from pong_core import (
+    MADRAB1_DOWN, MADRAB1_UP, TICK_HZ, PongState, move_paddle, step,
+)
+from tick_server import TickServer, backed_up, no_delay
+
+TICK = 1.0 / TICK_HZ
+SNAPSHOT_EVERY = 2
+INTERP_DELAY = 2.5 * SNAPSHOT_EVERY * TICK
+MAX_QUEUED_INPUTS = 8
+
+#packets, all fixed size and network byte order
+HELLO = struct.Struct("!B")                # side: 1 left, 2 right
+INPUT = struct.Struct("!IB")               # input seq, keys for your own paddle
+SNAPSHOT = struct.Struct("!II6f2H")        # tick, acked seq, ball x/y/dx/dy, madrab1/2 y, scores
+
+#keys a client sends for its own paddle
+UP = MADRAB1_UP
+DOWN = MADRAB1_DOWN
+
+
+class Player:
+    def __init__(self, writer, side):
+        self.writer = writer
+        self.side = side
+        self.inputs = collections.deque(maxlen=MAX_QUEUED_INPUTS)
+        self.keys = 0
+        self.ack = 0
+
+
+class Match:
+    def __init__(self):
+        self.state = PongState()
+        self.players = []
+
+
+class PongServer(TickServer):
+    # runs every match in one fixed tick loop; clients are paired up
+    # in the order they connect
+    interval = TICK
+
+    def __init__(self):
+        self.matches = []
+        self.waiting = None
+        self.ticks = 0
+        self.late_ticks = 0
+        self.dropped = 0
+        self.busy = 0.0
+
+    def join(self, writer):
+        match = self.waiting
+        if match is None:
+            match = Match()
+            self.waiting = match
+        else:
+            self.waiting = None
+            self.matches.append(match)
+        player = Player(writer, len(match.players) + 1)
+        match.players.append(player)
+        return match, player
+
+    def leave(self, match, player):
+        if self.waiting is match:
+            self.waiting = None
+        if match in self.matches:
+            self.matches.remove(match)
+        for other in match.players:
+            if other is not player:
+                other.writer.close()
+
+    async def handle(self, reader, writer):
+        no_delay(writer)
+        match, player = self.join(writer)
+        writer.write(HELLO.pack(player.side))
+        try:
+            while True:
+                data = await reader.readexactly(INPUT.size)
+                player.inputs.append(INPUT.unpack(data))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.leave(match, player)
+            writer.close()
+
+    def tick(self):
+        start = time.perf_counter()
+        for match in self.matches:
+            keys = 0
+            for player in match.players:
+                # one queued input per tick keeps the client's prediction in step
+                if player.inputs:
+                    player.ack, player.keys = player.inputs.popleft()
+                keys |= player.keys << (2 * (player.side - 1))
+            state = match.state
+            step(state, keys)
+
+            if state.tick % SNAPSHOT_EVERY == 0:
+                for player in match.players:
+                    # a client that is behind just misses snapshots, the
+                    # next one it gets has the whole table anyway
+                    if backed_up(player.writer):
+                        self.dropped += 1
+                        continue
+                    player.writer.write(SNAPSHOT.pack(
+                        state.tick, player.ack,
+                        state.ball_x, state.ball_y, state.ball_dx, state.ball_dy,
+                        state.madrab1_y, state.madrab2_y,
+                        state.score1, state.score2,
+                    ))
+        self.ticks += 1
+        self.busy += time.perf_counter() - start
+
+
+class PongClient:
+    # sends the held keys every tick, predicts its own paddle from them and
+    # shows the rest of the table interpolated between server snapshots
+    def __init__(self):
+        self.side = 0
+        self.held = 0
+        self.seq = 0
+        self.pending = collections.deque()
+        self.paddle_y = 0.0
+        self.snapshots = collections.deque(maxlen=16)
+        self.received = 0
+        self.writer = None
+
+    async def run(self, host, port):
+        reader, self.writer = await asyncio.open_connection(host, port)
+        no_delay(self.writer)
+        self.side, = HELLO.unpack(await reader.readexactly(HELLO.size))
+        receiving = asyncio.ensure_future(self._receive(reader))
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        try:
+            while not receiving.done():
+                self._send_input(self.held)
+                next_tick += TICK
+                await asyncio.sleep(max(0, next_tick - loop.time()))
+        finally:
+            receiving.cancel()
+            self.writer.close()
+
+    def _send_input(self, keys):
+        self.seq += 1
+        self.pending.append((self.seq, keys))
+        self.paddle_y = move_paddle(self.paddle_y, keys & UP, keys & DOWN)
+        self.writer.write(INPUT.pack(self.seq, keys))
+
+    async def _receive(self, reader):
+        try:
+            while True:
+                data = await reader.readexactly(SNAPSHOT.size)
+                snap = SNAPSHOT.unpack(data)
+                self.snapshots.append((time.perf_counter(), snap))
+                self.received += 1
+                self._reconcile(snap)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def _reconcile(self, snap):
+        ack = snap[1]
+        while self.pending and self.pending[0][0] <= ack:
+            self.pending.popleft()
+        y = snap[6] if self.side == 1 else snap[7]
+        for _, keys in self.pending:
+            y = move_paddle(y, keys & UP, keys & DOWN)
+        self.paddle_y = y
+
+    def view(self, now):
+        # a PongState to draw, INTERP_DELAY behind the newest snapshot
+        view = PongState()
+        snapshots = list(self.snapshots)
+        if not snapshots:
+            return view
+
+        at = now - INTERP_DELAY
+        older = newer = snapshots[-1]
+        for i in range(len(snapshots) - 1, 0, -1):
+            if snapshots[i - 1][0] <= at:
+                older, newer = snapshots[i - 1], snapshots[i]
+                break
+
+        span = newer[0] - older[0]
+        t = min(max((at - older[0]) / span, 0.0), 1.0) if span > 0 else 1.0
+        a = older[1]
+        b = newer[1]
+        if a[8:] != b[8:]:
+            # a goal was scored in between, don't slide the ball back to the centre
+            a = b
+        (view.tick, _, view.ball_x, view.ball_y, view.ball_dx, view.ball_dy,
+         view.madrab1_y, view.madrab2_y, view.score1, view.score2) = b
+        view.ball_x = a[2] + (b[2] - a[2]) * t
+        view.ball_y = a[3] + (b[3] - a[3]) * t
+        view.madrab1_y = a[6] + (b[6] - a[6]) * t
+        view.madrab2_y = a[7] + (b[7] - a[7]) * t
+
+        if self.side == 1:
+            view.madrab1_y = self.paddle_y
+        else:
+            view.madrab2_y = self.paddle_y
+        return view
+
+
+async def self_test(matches, seconds):
+    # a server and 2 * matches random bots over localhost
+    server = PongServer()
+    ready = asyncio.get_running_loop().create_future()
+    serving = asyncio.ensure_future(server.run("127.0.0.1", 0, ready))
+    port = await ready
+
+    clients = [PongClient() for _ in range(2 * matches)]
+    bots = [asyncio.ensure_future(client.run("127.0.0.1", port)) for client in clients]
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for client in clients:
+            client.held = random.choice((0, UP, DOWN))
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - start
+    playing = len(server.matches)
+
+    for bot in bots:
+        bot.cancel()
+    await asyncio.gather(*bots, return_exceptions=True)
+    while server.matches:
+        await asyncio.sleep(0.01)
+    serving.cancel()
+    await asyncio.gather(serving, return_exceptions=True)
+
+    received = sum(client.received for client in clients)
+    print("{} matches, {} ticks in {:.1f}s ({} late), server busy {:.1f}%, {:.0f} snapshots/s, {} bytes each, {} dropped".format(
+        playing, server.ticks, elapsed, server.late_ticks, 100 * server.busy / elapsed,
+        received / elapsed, SNAPSHOT.size, server.dropped))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ping pong match server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--self-test", type=int, metavar="MATCHES",
+                        help="run a server with MATCHES pairs of bots over localhost")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.self_test:
+        asyncio.run(self_test(args.self_test, args.seconds))
+    else:
+        asyncio.run(PongServer().run(args.host, args.port))
@@ -0,0 +1,96 @@
+import argparse
+import struct
+import time
+
+from pong_core import PongState, step
+from replay_codec import check_seed, decode_runs, encode_runs
+
+# a replay is a header then the held-key mask of every tick, run-length encoded
+MAGIC = b"PONG"
+VERSION = 1
+HEADER = struct.Struct("!4sBII")     # magic, version, seed, ticks
+
+
+class Recorder:
+    def __init__(self, seed):
+        self.seed = check_seed(seed)
+        self.ticks = 0
+        self.runs = []
+        self.keys = None
+        self.count = 0
+
+    def record(self, keys):
+        if keys == self.keys:
+            self.count += 1
+        else:
+            if self.count:
+                self.runs.append((self.keys, self.count))
+            self.keys = keys
+            self.count = 1
+        self.ticks += 1
+
+    def to_bytes(self):
+        runs = self.runs + ([(self.keys, self.count)] if self.count else [])
+        return encode(self.seed, self.ticks, runs)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+def encode(seed, ticks, runs):
+    # the keys go in the high nibble of each run, the count in the low one
+    out = bytearray(HEADER.pack(MAGIC, VERSION, seed, ticks))
+    return bytes(encode_runs(out, runs, 4))
+
+
+def decode(data):
+    if len(data) < HEADER.size:
+        raise ValueError("replay is truncated")
+    magic, version, seed, ticks = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a version {} pong replay".format(VERSION))
+
+    runs = decode_runs(data, HEADER.size, 4)
+    if sum(count for _, count in runs) != ticks:
+        raise ValueError("replay is truncated")
+    return seed, ticks, runs
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+
+def inputs(runs):
+    for keys, count in runs:
+        for _ in range(count):
+            yield keys
+
+
+def simulate(seed, runs):
+    state = PongState(seed)
+    for keys, count in runs:
+        for _ in range(count):
+            step(state, keys)
+    return state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-simulate pong replays headlessly")
+    parser.add_argument("replays", nargs="+")
+    args = parser.parse_args()
+
+    total_ticks = 0
+    start = time.perf_counter()
+    for path in args.replays:
+        try:
+            seed, ticks, runs = load(path)
+        except ValueError as e:
+            print("{}: invalid, {}".format(path, e))
+            continue
+        state = simulate(seed, runs)
+        total_ticks += ticks
+        print("{}: seed {}, {} ticks, score {}-{}".format(path, seed, ticks, state.score1, state.score2))
+    elapsed = time.perf_counter() - start
+    print("{} replays, {} ticks in {:.3f}s".format(len(args.replays), total_ticks, elapsed))
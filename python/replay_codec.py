@@ -0,0 +1,67 @@
+import argparse
+
+# seeds go in the replay header as an unsigned 32-bit int
+MAX_SEED = 0xFFFFFFFF
+
+
+def check_seed(seed):
+    # replays only make sense for a seeded game whose seed fits the header
+    if seed is None:
+        raise ValueError("only seeded games can be recorded")
+    if not 0 <= seed <= MAX_SEED:
+        raise ValueError("seed must be between 0 and {}".format(MAX_SEED))
+    return seed
+
+
+def seed_arg(text):
+    # argparse type for --seed
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError("{!r} is not a whole number".format(text))
+    try:
+        return check_seed(seed)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def encode_runs(out, runs, count_bits):
+    # appends (value, count) runs to out. Each run is one byte with the value
+    # above count_bits and a count of 1 to 2**count_bits - 1 below it, or 0
+    # there and the count as a varint after it
+    short = 1 << count_bits
+    for value, count in runs:
+        if count < short:
+            out.append(value << count_bits | count)
+            continue
+        out.append(value << count_bits)
+        while count >= 0x80:
+            out.append(count & 0x7F | 0x80)
+            count >>= 7
+        out.append(count)
+    return out
+
+
+def decode_runs(data, start, count_bits):
+    # the runs written by encode_runs from data[start:] to the end;
+    # ValueError if the last varint is cut off
+    mask = (1 << count_bits) - 1
+    runs = []
+    i = start
+    while i < len(data):
+        value = data[i] >> count_bits
+        count = data[i] & mask
+        i += 1
+        if not count:
+            shift = 0
+            while True:
+                if i >= len(data):
+                    raise ValueError("replay is truncated")
+                byte = data[i]
+                i += 1
+                count |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+        runs.append((value, count))
+    return runs
@@ -1,54 +1,220 @@
-import random
+import argparse
 import curses
+import random
+import time
+from collections import deque
+
+import frame_profiler
+from replay_codec import seed_arg
+from snake_ai import Autopilot
+from snake_core import DOWN, LEFT, RIGHT, UP, SnakeEnv
+from snake_render import DiffRenderer
+from snake_replay import MAX_WORLD, Recorder
+from snake_world import SnakeWorld
+
+KEYS = {
+    curses.KEY_UP: UP,
+    curses.KEY_DOWN: DOWN,
+    curses.KEY_LEFT: LEFT,
+    curses.KEY_RIGHT: RIGHT,
+}
+
+# ticks per second
+LEVELS = {
+    "easy": 6,
+    "normal": 10,
+    "hard": 15,
+    "insane": 25,
+}
+MAX_TURNS = 3
+# in world mode the view recentres once the head gets this close to its edge
+MARGIN = 4
+
+
+class TurnQueue:
+    # turns typed between ticks, used up one per tick so quick key
+    # combinations aren't lost; repeats are dropped and the queue is bounded
+    def __init__(self, direction):
+        self.turns = deque()
+        self.last = direction
+
+    def push(self, action):
+        if action != self.last and len(self.turns) < MAX_TURNS:
+            self.turns.append(action)
+            self.last = action
+
+    def pop(self):
+        return self.turns.popleft() if self.turns else None
+
+
+def draw_board(renderer, env):
+    for y, x in env.snake:
+        renderer.put(y, x, curses.ACS_CKBOARD)
+    if env.food is not None:
+        renderer.put(env.food[0], env.food[1], curses.ACS_PI)
+
+
+def draw_view(renderer, world, top, left):
+    # the part of a SnakeWorld that is on screen, with top/left the world
+    # cell shown in the corner
+    rows, cols = renderer.height, renderer.width
+    for y, x in world.occupied.in_rect(top, left, rows, cols):
+        renderer.put(y - top, x - left, curses.ACS_CKBOARD)
+    for y, x in world.food.in_rect(top, left, rows, cols):
+        renderer.put(y - top, x - left, curses.ACS_PI)
+    for y in (0, world.height - 1):
+        if top <= y < top + rows:
+            for x in range(max(left, 0), min(left + cols, world.width)):
+                renderer.put(y - top, x - left, '#')
+    for x in (0, world.width - 1):
+        if left <= x < left + cols:
+            for y in range(max(top, 0), min(top + rows, world.height)):
+                renderer.put(y - top, x - left, '#')
+
 
-screen = curses.initscr()
-curses.curs_set(0)
-screen_height, screen_width = screen.getmaxyx()
-window = curses.newwin(screen_height, screen_width, 0, 0)
-window.keypad(1)
-window.timeout(100)
-snk_x = screen_width // 4
-snk_y = screen_height // 2
-snake = [
-    [snk_y, snk_x],
-    [snk_y, snk_x-1],
-    [snk_y, snk_x-2 ]
-]
-food = [screen_height // 2, screen_width // 2]
-
-window.addch(food[0], food[1], curses.ACS_PI)
-key = curses.KEY_RIGHT
-while True:
-    next_key = window.getch()
-    key = key if next_key == -1 else next_key
-    if snake[0][0] in[0, screen_height] or snake[0][1]in [0, screen_width] or snake[0] in snake[1:]:
-        curses.endwin()
-        quit()
-
-    new_head = [snake[0][0], snake[0][1]]
-
-    if key == curses.KEY_DOWN:
-        new_head[0] +=1
-    if key == curses.KEY_UP:
-        new_head[0] -= 1
-    if key == curses.KEY_RIGHT:
-        new_head[1] += 1
-    if key == curses.KEY_LEFT:
-        new_head[1] -= 1
-
-    snake.insert(0, new_head)
-    if snake[0] == food:
-        food = None
-        while food is None:
-            new_food = [
-                random.randint(1, screen_height-1),
-                random.randint(1, screen_width-1)
-            ]
-            food = new_food if new_food not in snake else None 
-        window.addch(food[0], food[1], curses.ACS_PI)
+def play(screen, args, profiler):
+    curses.curs_set(0)
+    screen_height, screen_width = screen.getmaxyx()
+    window = curses.newwin(screen_height, screen_width, 0, 0)
+    window.keypad(1)
+
+    renderer = DiffRenderer(window)
+    seed = args.seed if args.seed is not None else random.getrandbits(32)
+    if args.world:
+        env = SnakeWorld(args.world, args.world, seed)
     else:
-        tail = snake.pop()
-        window.addch(tail[0], tail[1], ' ')
+        env = SnakeEnv(screen_height, screen_width, seed)
+    recorder = Recorder(env) if args.record else None
+    top = left = 0
+
+    def redraw():
+        nonlocal top, left
+        renderer.repaint()
+        if args.world:
+            y, x = env.snake[0]
+            if not (top + MARGIN <= y < top + renderer.height - MARGIN
+                    and left + MARGIN <= x < left + renderer.width - MARGIN):
+                top = y - renderer.height // 2
+                left = x - renderer.width // 2
+            draw_view(renderer, env, top, left)
+        else:
+            draw_board(renderer, env)
+
+    redraw()
+    renderer.flush()
+    turns = TurnQueue(env.direction)
+    autopilot = Autopilot(env) if args.autopilot else None
+    quit_game = False
+
+    def read_key(key):
+        nonlocal quit_game
+        if key == ord("q") and autopilot is not None:
+            quit_game = True
+        elif key in KEYS:
+            turns.push(KEYS[key])
+        elif key == curses.KEY_RESIZE:
+            # the board keeps its size, only what fits is shown
+            curses.update_lines_cols()
+            renderer.resize(curses.LINES, curses.COLS)
+            redraw()
+            renderer.flush()
+
+    interval = 1.0 / LEVELS[args.level]
+    next_tick = time.monotonic() + interval
+    frame = 0
+    while True:
+        # sleep in getch until the next tick, queueing keys as they come
+        while True:
+            wait = next_tick - time.monotonic()
+            if wait <= 0:
+                break
+            window.timeout(max(1, round(wait * 1000)))
+            read_key(window.getch())
+
+        now = time.monotonic()
+        next_tick += interval
+        if next_tick < now:
+            # fell behind, don't try to catch up with a burst of ticks
+            next_tick = now + interval
+
+        profiler.begin_frame()
+        window.timeout(0)
+        key = window.getch()
+        while key != -1:
+            read_key(key)
+            key = window.getch()
+        if quit_game:
+            return env.score
+        action = turns.pop() if autopilot is None else autopilot.choose()
+        profiler.mark("input")
 
+        new_head = env.turn(action)
+        if recorder is not None:
+            recorder.record(env.direction)
+        profiler.mark("physics")
+        crashed = env.hits(new_head)
+        profiler.mark("collision")
+
+        if not crashed:
+            food = env.food
+            env.advance(new_head)
+            profiler.mark("physics")
+        if crashed or not env.alive:
+            if recorder is not None:
+                recorder.save(args.record)
+            if autopilot is None:
+                return env.score
+            # attract mode: start over, the recording keeps the last game
+            env.reset(random.getrandbits(32))
+            autopilot.reset()
+            if recorder is not None:
+                recorder = Recorder(env)
+            redraw()
+            renderer.flush()
+            profiler.end_frame()
+            continue
+
+        if args.world:
+            # redraw the whole view and let the renderer work out what changed
+            redraw()
+        else:
+            if env.tail is not None:
+                renderer.put(env.tail[0], env.tail[1], ' ')
+            if env.food != food:
+                renderer.put(env.food[0], env.food[1], curses.ACS_PI)
+            renderer.put(new_head[0], new_head[1], curses.ACS_CKBOARD)
+        if args.profile:
+            if frame % 10 == 0:
+                summary = profiler.summary()
+            renderer.text(0, 0, summary)
+        renderer.flush()
+        profiler.mark("render")
+        profiler.end_frame()
+        frame += 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snake")
+    parser.add_argument("--level", choices=LEVELS, default="normal", help="how fast the snake moves")
+    parser.add_argument("--autopilot", action="store_true", help="let the computer play, restarting after every game (q quits)")
+    parser.add_argument("--world", type=int, metavar="SIZE", help="play on a SIZE x SIZE world that scrolls with the snake")
+    parser.add_argument("--seed", type=seed_arg, help="seed for the food")
+    parser.add_argument("--record", metavar="FILE", help="save a replay of the game when it ends")
+    parser.add_argument("--profile", action="store_true", help="show frame timings on the top border")
+    parser.add_argument("--profile-out", metavar="FILE", help="save the frame timings as .csv or .json")
+    args = parser.parse_args()
+    if args.world and args.record and args.world > MAX_WORLD:
+        parser.error("--record works on worlds up to {} cells across".format(MAX_WORLD))
+    if args.world and args.autopilot:
+        parser.error("the autopilot needs a board that fits on screen, it can't play --world")
+
+    if args.profile or args.profile_out:
+        profiler = frame_profiler.FrameProfiler(("input", "physics", "collision", "render"),
+                                                keep_trace=bool(args.profile_out))
+    else:
+        profiler = frame_profiler.NullProfiler()
 
-    window.addch(snake[0][0], snake[0][1], curses.ACS_CKBOARD)       
\ No newline at end of file
+    score = curses.wrapper(play, args, profiler)
+    if args.profile_out:
+        profiler.export(args.profile_out)
+    print("Score: {}".format(score))
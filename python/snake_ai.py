@@ -0,0 +1,505 @@
+import argparse
+import heapq
+import time
+from array import array
+from collections import deque
+from itertools import islice
+
+from snake_core import DOWN, LEFT, RIGHT, UP, SnakeEnv
+
+# past this share of the board the snake just follows the Hamiltonian cycle
+DENSE = 0.5
+# ticks to wait before trying again when there is no safe way to the food
+REPLAN = 8
+# laps of the cycle without eating before the autopilot stops trusting that
+# the snake is in order and checks again (in order it eats at least once a lap)
+HUNGRY = 2
+# free cells kept between head and tail when cutting across the cycle
+SLACK = 3
+# most cells one search may expand before the tick gives up on it; about
+# 1 ms of A* on a 200x60 board
+BUDGET = 250
+
+
+class Autopilot:
+    # steers a SnakeEnv toward the food with A*. Cells are y * width + x and
+    # every search reuses the same arrays, telling fresh entries from old
+    # ones by a stamp that goes up with each search. The body is kept as
+    # cells too, with blocked marking all of it but the tail; both follow
+    # the snake a cell at a time instead of being rebuilt every tick.
+    #
+    # The snake is kept "in order": every body cell lies between the tail
+    # and the head going round the Hamiltonian cycle, so the cells from the
+    # head onward to the tail are all free and following the cycle can never
+    # crash. A* only looks at paths that move forward along the cycle inside
+    # that free stretch, which keeps the order, so it never needs the tail
+    # check; past DENSE the snake follows the cycle itself. When the snake
+    # is out of order (a board too thin for a cycle, or a game handed over
+    # part way through) it uses A* with a flood fill to check the tail
+    # stays reachable, and walks the cycle whenever that is safe until the
+    # body lies along it. That fallback is not bounded by BUDGET.
+    def __init__(self, env):
+        self.env = env
+        self.width = width = env.width
+        size = env.height * width
+        self.stamp = 0
+        self.seen = array("I", [0]) * size
+        self.blocked = bytearray(size)
+        self.body = deque()
+        self.came = array("i", [0]) * size
+        self.cost = array("i", [0]) * size
+        self.queue = array("i", [0]) * size
+        self.frontier = []
+        self.neighbours = [self._neighbours(cell) for cell in range(size)]
+        self.cycle_next = self._hamiltonian_cycle()
+        # position of each cell along the cycle, -1 if it is not on it
+        self.order = array("i", [-1]) * size
+        self.cycle_len = 0
+        cell = next((c for c in range(size) if self.cycle_next[c] >= 0), -1)
+        while cell >= 0 and self.order[cell] < 0:
+            self.order[cell] = self.cycle_len
+            self.cycle_len += 1
+            cell = self.cycle_next[cell]
+        # a cell the cycle skips still fits in order if it sits next to two
+        # cycle cells one apart: going through it is just another shortcut
+        for cell in range(size):
+            if self.order[cell] < 0 and self.cycle_len:
+                for a in self.neighbours[cell]:
+                    if self.order[a] >= 0 and self.cycle_next[self.cycle_next[a]] in self.neighbours[cell]:
+                        self.order[cell] = (self.order[a] + 1) % self.cycle_len
+                        break
+        self.reset()
+
+    def reset(self):
+        self._rebuild_body()
+        self.path = []
+        self.target = None
+        self.wait = 0
+        self.score = self.env.score
+        self.hungry = 0
+        # cycle steps taken in a row while getting back in order
+        self.lined = 0
+        self.ordered = self._in_order()
+        if not self.ordered and self.cycle_len:
+            # a new game starts as a short straight snake, which is in
+            # order going one way round the cycle or the other
+            self._reverse_cycle()
+            self.ordered = self._in_order()
+
+    def _rebuild_body(self):
+        blocked = self.blocked
+        for cell in self.body:
+            blocked[cell] = 0
+        width = self.width
+        self.body = deque(y * width + x for y, x in self.env.snake)
+        for cell in self.body:
+            blocked[cell] = 1
+        blocked[self.body[-1]] = 0
+
+    def _follow_body(self):
+        # catch up with the one step the env has taken since the last tick,
+        # or start over if it did something else (like a new game)
+        snake = self.env.snake
+        width = self.width
+        body = self.body
+        blocked = self.blocked
+        head = snake[0][0] * width + snake[0][1]
+        if body and head == body[0] and len(body) == len(snake):
+            return
+        if len(snake) < 2 or not body or snake[1][0] * width + snake[1][1] != body[0]:
+            self._rebuild_body()
+            return
+        while len(body) >= len(snake):
+            blocked[body.pop()] = 0
+        body.appendleft(head)
+        blocked[head] = 1
+        if body[-1] != snake[-1][0] * width + snake[-1][1]:
+            self._rebuild_body()
+            return
+        blocked[body[-1]] = 0
+
+    def _neighbours(self, cell):
+        y, x = divmod(cell, self.width)
+        env = self.env
+        return [
+            ny * self.width + nx
+            for ny, nx in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1))
+            if 0 < ny < env.height - 1 and 0 < nx < env.width - 1
+        ]
+
+    def _hamiltonian_cycle(self):
+        # serpentine over the inner board with column 0 as the way back up;
+        # needs an even number of rows, so use the transpose if only the
+        # columns are even. If neither is, the last row is picked up by
+        # dipping into it two cells at a time from the row above, which
+        # covers all of it but the corner under column 0.
+        rows = self.env.height - 2
+        cols = self.env.width - 2
+        cycle_next = array("i", [-1]) * (self.env.height * self.width)
+        if rows < 2 or cols < 2:
+            return cycle_next
+        transpose = rows % 2 and not cols % 2
+        if transpose:
+            rows, cols = cols, rows
+        spare_row = rows % 2
+        rows -= spare_row
+
+        order = []
+        for r in range(rows):
+            if spare_row and r == rows - 1:
+                for c in range(cols - 1, 0, -2):
+                    order.extend([(r, c), (r + 1, c), (r + 1, c - 1), (r, c - 1)])
+            else:
+                span = range(1, cols) if r % 2 == 0 else range(cols - 1, 0, -1)
+                order.extend((r, c) for c in span)
+        order.extend((r, 0) for r in range(rows - 1, -1, -1))
+        if transpose:
+            order = [(c, r) for r, c in order]
+
+        cells = [(r + 1) * self.width + c + 1 for r, c in order]
+        for i, cell in enumerate(cells):
+            cycle_next[cell] = cells[(i + 1) % len(cells)]
+        return cycle_next
+
+    def _astar(self, start, goal):
+        # shortest path from start to goal around the blocked cells,
+        # returned goal first so pop() gives the next step
+        self.stamp += 1
+        stamp = self.stamp
+        seen, came, cost, blocked = self.seen, self.came, self.cost, self.blocked
+        neighbours = self.neighbours
+        gy, gx = divmod(goal, self.width)
+        frontier = self.frontier
+        frontier.clear()
+        seen[start] = stamp
+        cost[start] = 0
+        frontier.append((0, start))
+        while frontier:
+            _, cell = heapq.heappop(frontier)
+            if cell == goal:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = came[cell]
+                return path
+            g = cost[cell] + 1
+            for nxt in neighbours[cell]:
+                if blocked[nxt] or (seen[nxt] == stamp and cost[nxt] <= g):
+                    continue
+                seen[nxt] = stamp
+                cost[nxt] = g
+                came[nxt] = cell
+                y, x = divmod(nxt, self.width)
+                heapq.heappush(frontier, (g + abs(y - gy) + abs(x - gx), nxt))
+        return []
+
+    def _flood(self, start, goal=-1, limit=None):
+        # how many cells are reachable from start (stopping once there are
+        # limit of them), or -1 as soon as goal is
+        self.stamp += 1
+        stamp = self.stamp
+        seen, blocked, queue = self.seen, self.blocked, self.queue
+        neighbours = self.neighbours
+        seen[start] = stamp
+        queue[0] = start
+        head, tail = 0, 1
+        while head < tail:
+            cell = queue[head]
+            head += 1
+            for nxt in neighbours[cell]:
+                if nxt == goal:
+                    return -1
+                if not blocked[nxt] and seen[nxt] != stamp:
+                    seen[nxt] = stamp
+                    queue[tail] = nxt
+                    tail += 1
+                    if tail == limit:
+                        return tail
+        return tail
+
+    def _reverse_cycle(self):
+        cycle_next = self.cycle_next
+        back = array("i", [-1]) * len(cycle_next)
+        for cell, nxt in enumerate(cycle_next):
+            if nxt >= 0:
+                back[nxt] = cell
+            if self.order[cell] >= 0:
+                self.order[cell] = self.cycle_len - 1 - self.order[cell]
+        self.cycle_next = back
+
+    def _ahead(self, a, b):
+        # how far b is past a going round the cycle
+        return (self.order[b] - self.order[a]) % self.cycle_len
+
+    def _in_order(self):
+        order = self.order
+        body = self.body
+        if not self.cycle_len or any(order[cell] < 0 for cell in body):
+            return False
+        span = sum(self._ahead(behind, ahead) for ahead, behind in zip(body, islice(body, 1, None)))
+        return span < self.cycle_len
+
+    def _astar_ahead(self, start, goal):
+        # like _astar, but each step has to move further along the cycle
+        # without passing goal, so every cell it may use is free
+        self.stamp += 1
+        stamp = self.stamp
+        seen, came, cost = self.seen, self.came, self.cost
+        order, size = self.order, self.cycle_len
+        neighbours = self.neighbours
+        base = order[start]
+        reach = (order[goal] - base) % size
+        gy, gx = divmod(goal, self.width)
+        frontier = self.frontier
+        frontier.clear()
+        seen[start] = stamp
+        cost[start] = 0
+        frontier.append((0, start))
+        budget = BUDGET
+        while frontier and budget:
+            budget -= 1
+            _, cell = heapq.heappop(frontier)
+            if cell == goal:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = came[cell]
+                return path
+            here = (order[cell] - base) % size
+            g = cost[cell] + 1
+            for nxt in neighbours[cell]:
+                if order[nxt] < 0 or (seen[nxt] == stamp and cost[nxt] <= g):
+                    continue
+                ahead = (order[nxt] - base) % size
+                if ahead <= here or ahead > reach:
+                    continue
+                seen[nxt] = stamp
+                cost[nxt] = g
+                came[nxt] = cell
+                y, x = divmod(nxt, self.width)
+                heapq.heappush(frontier, (g + abs(y - gy) + abs(x - gx), nxt))
+        return []
+
+    def _plan_ahead(self, head, food):
+        # path to the food if it lies in the free stretch ahead of the head
+        tail = self.env.snake[-1][0] * self.width + self.env.snake[-1][1]
+        if self._ahead(head, food) > self._ahead(head, tail) - SLACK:
+            return []
+        return self._astar_ahead(head, food)
+
+    def _shortcut(self, head, food, cut=True):
+        # the neighbour furthest along the cycle that neither passes the
+        # food nor gets within SLACK of the tail, the food winning ties;
+        # with cut=False only the next step round the cycle
+        limit = 1
+        if cut:
+            tail = self.env.snake[-1][0] * self.width + self.env.snake[-1][1]
+            limit = max(1, min(self._ahead(head, food), self._ahead(head, tail) - SLACK))
+        best, gap = None, 0
+        for nxt in self.neighbours[head]:
+            if self.order[nxt] >= 0:
+                ahead = self._ahead(head, nxt)
+                if ahead <= limit and (ahead > gap or ahead == gap and nxt == food):
+                    best, gap = nxt, ahead
+        return best
+
+    def plan(self):
+        # blocked already leaves the tail free: it will have moved on by the
+        # time the head gets there
+        env = self.env
+        body = self.body
+        blocked = self.blocked
+        food = env.food[0] * self.width + env.food[1]
+        path = self._astar(body[0], food)
+        if not path:
+            return []
+
+        # after eating the body is the path then the front of the old body;
+        # block that instead for a moment and see if the head reaches the tail
+        keep = len(body) - len(path)
+        goal = body[keep] if keep >= 0 else path[len(body)]
+        freed = list(islice(body, max(keep + 1, 0), len(body) - 1))
+        taken = path[:len(body)]
+        for cell in freed:
+            blocked[cell] = 0
+        for cell in taken:
+            blocked[cell] = 1
+        reaches = self._flood(path[0], goal) == -1
+        for cell in taken:
+            blocked[cell] = 0
+        for cell in freed:
+            blocked[cell] = 1
+        return path if reaches else []
+
+    def _to_tail(self, head):
+        # first step of the shortest way to the tail, which always stays open
+        path = self._astar(head, self.body[-1])
+        return path[-1] if path else None
+
+    def _safest(self, head):
+        # the free neighbour with the most room behind it, counting
+        # no further than the length of the snake
+        limit = len(self.body) + 1
+        best, room = None, -1
+        for nxt in self.neighbours[head]:
+            if not self._free(nxt):
+                continue
+            size = self._flood(nxt, limit=limit)
+            if size > room:
+                best, room = nxt, size
+        return best
+
+    def _keeps_tail(self, nxt):
+        # can the head still reach the tail after stepping onto nxt; that is
+        # the cell before the tail unless nxt is the food and the tail stays
+        body = self.body
+        food = self.env.food[0] * self.width + self.env.food[1]
+        goal = body[-1] if nxt == food else body[-2]
+        was = self.blocked[nxt]
+        self.blocked[nxt] = 1
+        reaches = self._flood(nxt, goal) == -1
+        self.blocked[nxt] = was
+        return reaches
+
+    def _free(self, cell):
+        return not self.env.hits(divmod(cell, self.width))
+
+    def _cycle_step(self, head):
+        # the next cycle cell while getting back in order, if it is safe
+        nxt = self.cycle_next[head]
+        if nxt < 0 or not self._free(nxt) or not self._keeps_tail(nxt):
+            return None
+        return nxt
+
+    def _in_order_step(self, head, food, dense):
+        if dense:
+            return self._shortcut(head, food, cut=False)
+        if not (self.path and self.target == food and self._free(self.path[-1])):
+            self.path = []
+            self.target = food
+            if self.wait:
+                self.wait -= 1
+            else:
+                self.path = self._plan_ahead(head, food)
+                if not self.path:
+                    self.wait = REPLAN
+        return self.path.pop() if self.path else self._shortcut(head, food)
+
+    def _out_of_order_step(self, head):
+        env = self.env
+        if self.path and self._free(self.path[-1]) and env.food == self.target:
+            return self.path.pop()
+        self.path = []
+        if self.wait:
+            self.wait -= 1
+        else:
+            self.target = env.food
+            self.path = self.plan()
+            if not self.path:
+                self.wait = REPLAN
+        nxt = self.path.pop() if self.path else self._to_tail(head)
+        if nxt is None or not self._free(nxt):
+            nxt = self._safest(head)
+        return nxt
+
+    def choose(self):
+        env = self.env
+        width = self.width
+        self._follow_body()
+        head = self.body[0]
+        food = env.food[0] * width + env.food[1]
+        inner = (env.height - 2) * (env.width - 2)
+        dense = len(env.snake) > DENSE * inner
+
+        if env.score != self.score:
+            self.score = env.score
+            self.hungry = 0
+        else:
+            self.hungry += 1
+            if self.hungry > HUNGRY * self.cycle_len:
+                self.hungry = 0
+                self.ordered = self._in_order()
+
+        if self.ordered and self.order[food] < 0:
+            # food off the cycle can only be reached by leaving it
+            self.ordered = False
+        nxt = None
+        if self.ordered:
+            nxt = self._in_order_step(head, food, dense)
+            if nxt is None or not self._free(nxt):
+                self.ordered = False
+                nxt = None
+        if nxt is None:
+            if self.order[food] >= 0:
+                nxt = self._cycle_step(head)
+            if nxt is None:
+                self.lined = 0
+                nxt = self._out_of_order_step(head)
+            else:
+                self.lined += 1
+                self.path = []
+                if self.lined > len(env.snake):
+                    # the whole body should now lie along the cycle
+                    self.ordered = self._in_order()
+                    self.lined = 0
+
+        if nxt is None:
+            # boxed in, any direction loses
+            return None
+        dy, dx = divmod(nxt - head + width + 1, width)
+        return {(0, 1): UP, (2, 1): DOWN, (1, 0): LEFT, (1, 2): RIGHT}[(dy, dx)]
+
+
+# plays seeded games and returns the ones where the snake died or went more
+# than a few laps of the board without eating before filling it
+def check(sizes=((12, 20), (13, 21), (16, 25)), games=3, fill=1.0):
+    failed = []
+    for height, width in sizes:
+        inner = (height - 2) * (width - 2)
+        for seed in range(games):
+            env = SnakeEnv(height, width, seed=seed)
+            pilot = Autopilot(env)
+            done = False
+            last_eat, score = 0, env.score
+            while not done and len(env.snake) < fill * inner:
+                _, done = env.step(pilot.choose())
+                if env.score != score:
+                    last_eat, score = env.ticks, env.score
+                if env.ticks - last_eat > 4 * inner:
+                    break
+            if len(env.snake) < fill * inner:
+                failed.append((height, width, seed, len(env.snake), env.ticks))
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the snake autopilot headlessly")
+    parser.add_argument("--height", type=int, default=60)
+    parser.add_argument("--width", type=int, default=200)
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--max-ticks", type=int, default=20000)
+    parser.add_argument("--check", action="store_true",
+                        help="check the snake keeps growing on a few small boards, exit 1 if not")
+    args = parser.parse_args()
+
+    if args.check:
+        failed = check()
+        for height, width, seed, length, ticks in failed:
+            print("{}x{} seed {}: stuck at length {} after {} ticks".format(height, width, seed, length, ticks))
+        print("ok" if not failed else "{} games stopped growing".format(len(failed)))
+        raise SystemExit(1 if failed else 0)
+
+    for game in range(args.games):
+        env = SnakeEnv(args.height, args.width, seed=game)
+        pilot = Autopilot(env)
+        worst = 0.0
+        start = time.perf_counter()
+        done = False
+        while not done and env.ticks < args.max_ticks:
+            t = time.perf_counter()
+            action = pilot.choose()
+            worst = max(worst, time.perf_counter() - t)
+            _, done = env.step(action)
+        elapsed = time.perf_counter() - start
+        print("game {}: score {} in {} ticks, {:.3f} ms/tick on average, worst {:.2f} ms".format(
+            game, env.score, env.ticks, 1000 * elapsed / env.ticks, 1000 * worst))
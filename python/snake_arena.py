@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import curses
+import random
+import struct
+import time
+from collections import deque
+
+from snake_core import DOWN, LEFT, MOVES, RIGHT, START_LENGTH, UP
+from snake_render import DiffRenderer
+from tick_server import TickServer, backed_up, no_delay
+
+TICK_HZ = 20
+BOARD_HEIGHT = 200
+BOARD_WIDTH = 400
+FOOD_COUNT = 300
+MAX_VIEW = (64, 240)
+# a client's view recentres once its head gets this close to the edge
+MARGIN = 4
+# changes are bucketed by chunk so each client only looks at the chunks it can see
+CHUNK = 16
+
+#cell values in the shared grid; a snake's cells hold its id + 2
+EMPTY = 0
+FOOD = 1
+
+#packets, all fixed size and network byte order
+VIEW = struct.Struct("!HH")          # client hello: view rows, cols
+WELCOME = struct.Struct("!BHH")      # your id, board height, width
+TURN = struct.Struct("!B")           # client: new direction
+FRAME = struct.Struct("!IBHHH")      # tick, full view?, view top, left, cell count
+CELL = struct.Struct("!HHB")         # y, x, cell value
+
+
+class ArenaSnake:
+    def __init__(self, id, writer, rows, cols):
+        self.id = id
+        self.value = id + 2
+        self.writer = writer
+        self.rows = min(rows, MAX_VIEW[0])
+        self.cols = min(cols, MAX_VIEW[1])
+        self.top = self.left = 0
+        self.needs_full = True
+        self.body = deque()
+        self.direction = RIGHT
+        self.turn = None
+        self.alive = False
+        self.score = 0
+
+
+class Arena(TickServer):
+    # every snake shares one occupancy grid (a bytearray of cell values), so
+    # collisions between snakes are a single lookup. Each tick the changed
+    # cells are sent to the clients that can see them; a client whose view
+    # moves gets its whole view once, and so does one that fell behind.
+    interval = 1.0 / TICK_HZ
+
+    def __init__(self, height=BOARD_HEIGHT, width=BOARD_WIDTH, seed=None):
+        self.height = height
+        self.width = width
+        self.grid = bytearray(height * width)
+        self.rng = random.Random(seed)
+        self.snakes = {}
+        self.free_ids = list(range(250))
+        self.changes = {}
+        self.tick_count = 0
+        self.late_ticks = 0
+        self.busy = 0.0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.food = 0
+        while self.food < FOOD_COUNT:
+            self._drop_food()
+
+    def _set(self, y, x, value):
+        self.grid[y * self.width + x] = value
+        self.changes.setdefault((y // CHUNK, x // CHUNK), []).append((y, x, value))
+
+    def _random_empty(self):
+        while True:
+            y = self.rng.randrange(1, self.height - 1)
+            x = self.rng.randrange(1, self.width - 1)
+            if not self.grid[y * self.width + x]:
+                return y, x
+
+    def _drop_food(self):
+        y, x = self._random_empty()
+        self._set(y, x, FOOD)
+        self.food += 1
+
+    def spawn(self, snake):
+        # somewhere with room for the whole body heading right
+        width = self.width
+        while True:
+            y, x = self._random_empty()
+            cells = [(y, x - i) for i in range(START_LENGTH)]
+            if x - START_LENGTH > 0 and not any(self.grid[cy * width + cx] for cy, cx in cells):
+                break
+        snake.body = deque(cells)
+        for cy, cx in cells:
+            self._set(cy, cx, snake.value)
+        snake.direction = RIGHT
+        snake.turn = None
+        snake.alive = True
+        snake.score = 0
+
+    def _kill(self, snake):
+        for y, x in snake.body:
+            if self.grid[y * self.width + x] == snake.value:
+                self._set(y, x, EMPTY)
+        snake.body.clear()
+        snake.alive = False
+
+    def join(self, writer, rows, cols):
+        snake = ArenaSnake(self.free_ids.pop(0), writer, rows, cols)
+        self.snakes[snake.id] = snake
+        self.spawn(snake)
+        return snake
+
+    def leave(self, snake):
+        self._kill(snake)
+        del self.snakes[snake.id]
+        self.free_ids.append(snake.id)
+
+    def step(self):
+        width = self.width
+        grid = self.grid
+        moving = []
+        for snake in self.snakes.values():
+            if not snake.alive:
+                self.spawn(snake)
+                continue
+            if snake.turn is not None:
+                snake.direction = snake.turn
+                snake.turn = None
+            dy, dx = MOVES[snake.direction]
+            y, x = snake.body[0]
+            head = (y + dy, x + dx)
+            inside = 0 < head[0] < self.height - 1 and 0 < head[1] < width - 1
+            eats = inside and grid[head[0] * width + head[1]] == FOOD
+            moving.append((snake, head, inside, eats))
+
+        # tails move out before heads move in, so chasing a tail is safe
+        for snake, head, inside, eats in moving:
+            if not eats:
+                ty, tx = snake.body.pop()
+                self._set(ty, tx, EMPTY)
+
+        targets = {}
+        for _, head, _, _ in moving:
+            targets[head] = targets.get(head, 0) + 1
+
+        # every death is decided on the same grid before anyone is cleared
+        # off it, so the order snakes joined in never matters
+        dead = [
+            not inside or targets[head] > 1 or grid[head[0] * width + head[1]] > FOOD
+            for _, head, inside, _ in moving
+        ]
+        for (snake, _, _, _), died in zip(moving, dead):
+            if died:
+                self._kill(snake)
+        for (snake, head, _, eats), died in zip(moving, dead):
+            if died:
+                continue
+            y, x = head
+            snake.body.appendleft(head)
+            self._set(y, x, snake.value)
+            if eats:
+                snake.score += 1
+                self.food -= 1
+
+        while self.food < FOOD_COUNT:
+            self._drop_food()
+
+    def _full_view(self, snake):
+        cells = []
+        grid = self.grid
+        width = self.width
+        for y in range(max(snake.top, 0), min(snake.top + snake.rows, self.height)):
+            left = max(snake.left, 0)
+            row = grid[y * width + left:y * width + min(snake.left + snake.cols, width)]
+            for i, value in enumerate(row):
+                if value:
+                    cells.append(CELL.pack(y, left + i, value))
+        return cells
+
+    def _changed_in_view(self, snake):
+        cells = []
+        top, left = snake.top, snake.left
+        bottom, right = top + snake.rows, left + snake.cols
+        for cy in range(max(top, 0) // CHUNK, (bottom - 1) // CHUNK + 1):
+            for cx in range(max(left, 0) // CHUNK, (right - 1) // CHUNK + 1):
+                for y, x, value in self.changes.get((cy, cx), ()):
+                    if top <= y < bottom and left <= x < right:
+                        cells.append(CELL.pack(y, x, value))
+        return cells
+
+    def broadcast(self):
+        for snake in self.snakes.values():
+            if backed_up(snake.writer):
+                # skip it until it catches up, then resend the whole view
+                snake.needs_full = True
+                self.dropped += 1
+                continue
+            full = snake.needs_full
+            if snake.body:
+                y, x = snake.body[0]
+                if full or not (snake.top + MARGIN <= y < snake.top + snake.rows - MARGIN
+                                and snake.left + MARGIN <= x < snake.left + snake.cols - MARGIN):
+                    snake.top = max(y - snake.rows // 2, 0)
+                    snake.left = max(x - snake.cols // 2, 0)
+                    full = True
+            snake.needs_full = False
+            cells = self._full_view(snake) if full else self._changed_in_view(snake)
+            packet = FRAME.pack(self.tick_count, full, snake.top, snake.left, len(cells)) + b"".join(cells)
+            snake.writer.write(packet)
+            self.bytes_sent += len(packet)
+        self.changes.clear()
+
+    def tick(self):
+        start = time.perf_counter()
+        self.step()
+        self.broadcast()
+        self.tick_count += 1
+        self.busy += time.perf_counter() - start
+
+    async def handle(self, reader, writer):
+        no_delay(writer)
+        try:
+            rows, cols = VIEW.unpack(await reader.readexactly(VIEW.size))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        if not self.free_ids:
+            writer.close()
+            return
+        snake = self.join(writer, rows, cols)
+        writer.write(WELCOME.pack(snake.id, self.height, self.width))
+        try:
+            while True:
+                direction, = TURN.unpack(await reader.readexactly(TURN.size))
+                if direction in MOVES:
+                    snake.turn = direction
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.leave(snake)
+            writer.close()
+
+
+class ArenaClient:
+    # keeps the cells of its view up to date from the server's frames
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.id = None
+        self.cells = {}
+        self.top = self.left = 0
+        self.frames = 0
+        self.changed = asyncio.Event()
+        self.writer = None
+
+    async def connect(self, host, port):
+        reader, self.writer = await asyncio.open_connection(host, port)
+        no_delay(self.writer)
+        self.writer.write(VIEW.pack(self.rows, self.cols))
+        self.id, self.height, self.width = WELCOME.unpack(await reader.readexactly(WELCOME.size))
+        return reader
+
+    def send_turn(self, direction):
+        self.writer.write(TURN.pack(direction))
+
+    async def receive(self, reader):
+        try:
+            while True:
+                _, full, self.top, self.left, count = FRAME.unpack(await reader.readexactly(FRAME.size))
+                data = await reader.readexactly(CELL.size * count)
+                if full:
+                    self.cells.clear()
+                for y, x, value in CELL.iter_unpack(data):
+                    if value:
+                        self.cells[(y, x)] = value
+                    else:
+                        self.cells.pop((y, x), None)
+                self.frames += 1
+                self.changed.set()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+
+KEYS = {
+    curses.KEY_UP: UP,
+    curses.KEY_DOWN: DOWN,
+    curses.KEY_LEFT: LEFT,
+    curses.KEY_RIGHT: RIGHT,
+}
+
+
+async def play(screen, host, port):
+    curses.curs_set(0)
+    screen.nodelay(True)
+    screen.keypad(True)
+    rows, cols = screen.getmaxyx()
+    renderer = DiffRenderer(screen)
+    client = ArenaClient(rows, cols)
+    reader = await client.connect(host, port)
+    receiving = asyncio.ensure_future(client.receive(reader))
+    own = client.id + 2
+    while not receiving.done():
+        await client.changed.wait()
+        client.changed.clear()
+
+        key = screen.getch()
+        while key != -1:
+            if key == ord("q"):
+                receiving.cancel()
+                return
+            if key in KEYS:
+                client.send_turn(KEYS[key])
+            key = screen.getch()
+
+        renderer.repaint()
+        for (y, x), value in client.cells.items():
+            if value == FOOD:
+                char = curses.ACS_PI
+            elif value == own:
+                char = curses.ACS_CKBOARD
+            else:
+                char = ord("o")
+            renderer.put(y - client.top, x - client.left, char)
+        renderer.flush()
+
+
+async def self_test(players, seconds):
+    # an arena and random bots over localhost
+    arena = Arena(seed=0)
+    ready = asyncio.get_running_loop().create_future()
+    serving = asyncio.ensure_future(arena.run("127.0.0.1", 0, ready))
+    port = await ready
+
+    clients = [ArenaClient(24, 80) for _ in range(players)]
+    readers = [await client.connect("127.0.0.1", port) for client in clients]
+    receiving = [asyncio.ensure_future(c.receive(r)) for c, r in zip(clients, readers)]
+    arena.tick_count = arena.late_ticks = arena.bytes_sent = arena.dropped = 0
+    arena.busy = 0.0
+    rng = random.Random(0)
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for client in clients:
+            if rng.random() < 0.3:
+                client.send_turn(rng.choice((UP, DOWN, LEFT, RIGHT)))
+        await asyncio.sleep(1.0 / TICK_HZ)
+    elapsed = time.perf_counter() - start
+
+    for client in clients:
+        client.writer.close()
+    await asyncio.gather(*receiving, return_exceptions=True)
+    while arena.snakes:
+        await asyncio.sleep(0.01)
+    serving.cancel()
+    await asyncio.gather(serving, return_exceptions=True)
+
+    print("{} players, {} ticks in {:.1f}s ({} late), server busy {:.1f}%, {:.0f} bytes per player per tick, {} frames dropped".format(
+        players, arena.tick_count, elapsed, arena.late_ticks, 100 * arena.busy / elapsed,
+        arena.bytes_sent / max(arena.tick_count * players, 1), arena.dropped))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multiplayer snake arena")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--connect", action="store_true", help="join the arena at --host/--port (q quits)")
+    parser.add_argument("--self-test", type=int, metavar="PLAYERS",
+                        help="run an arena with PLAYERS random bots over localhost")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.self_test:
+        asyncio.run(self_test(args.self_test, args.seconds))
+    elif args.connect:
+        curses.wrapper(lambda screen: asyncio.run(play(screen, args.host, args.port)))
+    else:
+        asyncio.run(Arena().run(args.host, args.port))
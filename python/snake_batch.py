@@ -0,0 +1,105 @@
+import time
+
+import numpy as np
+
+from snake_core import DOWN, LEFT, RIGHT, START_LENGTH, UP
+
+DY = np.zeros(4, dtype=np.int64)
+DX = np.zeros(4, dtype=np.int64)
+DY[UP], DY[DOWN], DX[LEFT], DX[RIGHT] = -1, 1, -1, 1
+NEVER = np.iinfo(np.int32).min
+
+
+class SnakeBatch:
+    # many boards stepped together. Instead of a body list each board keeps
+    # the tick at which the head last entered every cell; a cell is part of
+    # the snake while that tick is within the snake's length of now, so the
+    # tail never has to be removed explicitly. Boards that end are reset.
+    def __init__(self, n, height, width, seed=None):
+        self.n = n
+        self.height = height
+        self.width = width
+        self.rng = np.random.default_rng(seed)
+        self.visited = np.full((n, height, width), NEVER, dtype=np.int32)
+        self.head_y = np.zeros(n, dtype=np.int64)
+        self.head_x = np.zeros(n, dtype=np.int64)
+        self.food_y = np.zeros(n, dtype=np.int64)
+        self.food_x = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.tick = 0
+        self.boards = np.arange(n)
+        self.reset_boards(self.boards)
+
+    def reset_boards(self, idx):
+        y = self.height // 2
+        x = self.width // 4
+        self.visited[idx] = NEVER
+        for i in range(START_LENGTH):
+            self.visited[idx, y, x - i] = self.tick - i
+        self.head_y[idx] = y
+        self.head_x[idx] = x
+        self.food_y[idx] = self.height // 2
+        self.food_x[idx] = self.width // 2
+        self.direction[idx] = RIGHT
+        self.length[idx] = START_LENGTH
+
+    def place_food(self, idx):
+        # a uniformly random empty cell inside the walls on each board in idx
+        inside = self.visited[idx, 1:-1, 1:-1]
+        free = inside <= self.tick - self.length[idx, None, None]
+        scores = self.rng.random(free.shape) * free
+        flat = scores.reshape(len(idx), -1).argmax(axis=1)
+        y, x = np.divmod(flat, self.width - 2)
+        self.food_y[idx] = y + 1
+        self.food_x[idx] = x + 1
+        return free.reshape(len(idx), -1).any(axis=1)
+
+    def step(self, actions=None):
+        # actions is an (n,) array of UP/DOWN/LEFT/RIGHT, or -1 to keep going;
+        # returns (rewards, dones) like SnakeEnv.step for every board
+        if actions is not None:
+            self.direction = np.where(actions >= 0, actions, self.direction)
+        y = self.head_y + DY[self.direction]
+        x = self.head_x + DX[self.direction]
+
+        wall = (y <= 0) | (y >= self.height - 1) | (x <= 0) | (x >= self.width - 1)
+        ate = (y == self.food_y) & (x == self.food_x)
+        # the tail moves out before the head moves in, so chasing it is safe
+        seen = self.visited[self.boards, np.clip(y, 0, self.height - 1), np.clip(x, 0, self.width - 1)]
+        body = seen > self.tick - self.length + 1
+        dead = wall | body
+
+        self.tick += 1
+        alive = ~dead
+        self.visited[self.boards[alive], y[alive], x[alive]] = self.tick
+        self.head_y = np.where(alive, y, self.head_y)
+        self.head_x = np.where(alive, x, self.head_x)
+
+        rewards = np.where(dead, -1, ate.astype(np.int64))
+        eaters = np.flatnonzero(ate & alive)
+        if len(eaters):
+            self.length[eaters] += 1
+            full = ~self.place_food(eaters)
+            dead[eaters[full]] = True
+
+        done = np.flatnonzero(dead)
+        if len(done):
+            self.reset_boards(done)
+        return rewards, dead
+
+
+if __name__ == "__main__":
+    n = 4096
+    ticks = 500
+    batch = SnakeBatch(n, 60, 200, seed=0)
+    rng = np.random.default_rng(0)
+    actions = np.where(rng.random((ticks, n)) < 0.2, rng.integers(0, 4, (ticks, n)), -1)
+    games = 0
+    start = time.perf_counter()
+    for t in range(ticks):
+        rewards, dones = batch.step(actions[t])
+        games += int(dones.sum())
+    elapsed = time.perf_counter() - start
+    print("{} boards x {} ticks in {:.2f}s ({:.0f} board-ticks/s), {} games".format(
+        n, ticks, elapsed, n * ticks / elapsed, games))
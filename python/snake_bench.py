@@ -0,0 +1,163 @@
+import argparse
+import array
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from snake_ai import Autopilot
+from snake_core import SnakeEnv
+
+# a change bigger than this between two runs is flagged
+THRESHOLD = 0.10
+
+
+def cycle_order(env):
+    # the autopilot's Hamiltonian cycle as a list of (y, x), so a snake
+    # laid along it and following it never dies
+    cycle_next = Autopilot(env).cycle_next
+    start = cycle_next.index(max(cycle_next))
+    order = [start]
+    cell = cycle_next[start]
+    while cell != start:
+        order.append(cell)
+        cell = cycle_next[cell]
+    return [divmod(cell, env.width) for cell in order]
+
+
+def lay_snake(env, length):
+    # replaces the snake with one of the given length along the cycle; returns
+    # the direction to take from each cell (y * width + x) to keep following it
+    order = cycle_order(env)
+    for cell in env.snake:
+        env.occupied.discard(cell)
+        env.free_cells.give(*cell)
+    env.snake.clear()
+    for cell in reversed(order[:length]):
+        env.snake.append(cell)
+        env.occupied.add(cell)
+        env.free_cells.take(*cell)
+    env.food = env.free_cells.pick(env.rng)
+
+    steer = array.array("b", [-1]) * (env.height * env.width)
+    for i, (y, x) in enumerate(order):
+        ny, nx = order[(i + 1) % len(order)]
+        steer[y * env.width + x] = {(-1, 0): 0, (1, 0): 1, (0, -1): 2, (0, 1): 3}[(ny - y, nx - x)]
+    return steer
+
+
+def snake_scenario(height, width, length):
+    def setup():
+        env = SnakeEnv(height, width, seed=0)
+        steer = lay_snake(env, length)
+
+        def tick():
+            y, x = env.snake[0]
+            env.step(steer[y * width + x])
+        return tick
+    return setup
+
+
+def food_scenario(height, width, fill):
+    # food placement alone on a nearly full board: take a random free cell
+    # as the food gets eaten, give one back as the tail moves on
+    def setup():
+        env = SnakeEnv(height, width, seed=0)
+        cells = env.free_cells
+        while len(cells.cells) > (1 - fill) * (height - 2) * (width - 2):
+            cells.take(*cells.pick(env.rng))
+
+        def tick():
+            y, x = cells.pick(env.rng)
+            cells.take(y, x)
+            cells.give(y, x)
+        return tick
+    return setup
+
+
+SCENARIOS = {
+    "short_snake": (snake_scenario(24, 80, 3), 20000),
+    "long_snake_10k": (snake_scenario(120, 200, 10000), 20000),
+    "full_board_food": (food_scenario(60, 200, 0.95), 100000),
+    "large_terminal": (snake_scenario(300, 1000, 3), 20000),
+}
+
+
+def measure(setup, ticks, repeats):
+    # CPython keeps no running count of allocations, so blocks_per_tick is
+    # how many more memory blocks are live afterwards, per tick
+    best = None
+    for _ in range(repeats):
+        tick = setup()
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        for _ in range(ticks):
+            tick()
+        elapsed = time.perf_counter_ns() - start
+        grown = sys.getallocatedblocks() - blocks
+        if best is None or elapsed < best[0]:
+            best = (elapsed, grown)
+
+    # memory is measured on its own run, tracemalloc slows everything down;
+    # setup is what the board and snake hold, peak is the most while ticking
+    tracemalloc.start()
+    tick = setup()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for _ in range(min(ticks, 2000)):
+        tick()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "ticks": ticks,
+        "ns_per_tick": round(best[0] / ticks, 1),
+        "blocks_per_tick": round(best[1] / ticks, 4),
+        "setup_kib": round(held / 1024, 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(old, new):
+    print("{:<18} {:>14} {:>14} {:>8}".format("scenario", "old ns/tick", "new ns/tick", "change"))
+    worse = False
+    for name, result in new["scenarios"].items():
+        before = old["scenarios"].get(name)
+        if before is None:
+            continue
+        change = result["ns_per_tick"] / before["ns_per_tick"] - 1
+        flag = "  REGRESSION" if change > THRESHOLD else ""
+        worse = worse or bool(flag)
+        print("{:<18} {:>14} {:>14} {:>+7.1%}{}".format(
+            name, before["ns_per_tick"], result["ns_per_tick"], change, flag))
+    return worse
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the snake game logic headlessly")
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, help="scenarios to run")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per scenario, the fastest counts")
+    parser.add_argument("--label", default="", help="name for this run, e.g. a git revision")
+    parser.add_argument("--out", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "label": args.label,
+        "python": platform.python_version(),
+        "scenarios": {},
+    }
+    for name in args.only or SCENARIOS:
+        setup, ticks = SCENARIOS[name]
+        results["scenarios"][name] = result = measure(setup, ticks, args.repeats)
+        print("{:<18} {:>10} ns/tick {:>8} blocks/tick {:>10} KiB setup {:>10} KiB peak".format(
+            name, result["ns_per_tick"], result["blocks_per_tick"], result["setup_kib"], result["peak_kib"]))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(json.load(f), results):
+                sys.exit(1)
@@ -0,0 +1,162 @@
+import random
+import time
+from collections import deque
+
+#actions
+UP = 0
+DOWN = 1
+LEFT = 2
+RIGHT = 3
+MOVES = {
+    UP: (-1, 0),
+    DOWN: (1, 0),
+    LEFT: (0, -1),
+    RIGHT: (0, 1),
+}
+START_LENGTH = 3
+
+# empty FreeCells per board size, copied by every env of that size
+empty_boards = {}
+
+
+class FreeCells:
+    # every empty cell inside the walls, in an array with swap-remove plus
+    # an index of where each cell sits in it, so picking a random empty
+    # cell and updating it as the snake moves are all O(1)
+    def __init__(self, height, width):
+        self.width = width
+        self.cells = [y * width + x for y in range(1, height-1) for x in range(1, width-1)]
+        self.index = [-1] * (height * width)
+        for i, cell in enumerate(self.cells):
+            self.index[cell] = i
+
+    def copy(self):
+        other = FreeCells.__new__(FreeCells)
+        other.width = self.width
+        other.cells = self.cells[:]
+        other.index = self.index[:]
+        return other
+
+    def take(self, y, x):
+        cell = y * self.width + x
+        i = self.index[cell]
+        if i < 0:
+            return
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i] = last
+            self.index[last] = i
+        self.index[cell] = -1
+
+    def give(self, y, x):
+        cell = y * self.width + x
+        self.index[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def pick(self, rng=random):
+        # a uniformly random empty cell, or None when the board is full
+        if not self.cells:
+            return None
+        return divmod(self.cells[rng.randrange(len(self.cells))], self.width)
+
+
+class SnakeRules:
+    # moving and crashing, shared by SnakeEnv and snake_world.SnakeWorld;
+    # subclasses keep height, width, snake, occupied, direction and alive
+    # and define advance(head), which moves the snake and returns the reward
+    def turn(self, action=None):
+        # where the head goes next; None keeps the current direction
+        if action is not None:
+            self.direction = action
+        dy, dx = MOVES[self.direction]
+        y, x = self.snake[0]
+        return (y + dy, x + dx)
+
+    def hits(self, head):
+        y, x = head
+        if y <= 0 or y >= self.height - 1 or x <= 0 or x >= self.width - 1:
+            return True
+        # the tail moves out before the head moves in, so chasing it is safe
+        return head in self.occupied and head != self.snake[-1]
+
+    def step(self, action=None):
+        # returns (reward, done): 1 for food, -1 for crashing
+        head = self.turn(action)
+        if self.hits(head):
+            self.alive = False
+            return -1, True
+        reward = self.advance(head)
+        return reward, not self.alive
+
+
+class SnakeEnv(SnakeRules):
+    # the whole game with no display; the outermost rows and columns are walls
+    def __init__(self, height, width, seed=None):
+        self.height = height
+        self.width = width
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.empty_board = empty_boards.get((height, width))
+        if self.empty_board is None:
+            self.empty_board = empty_boards[(height, width)] = FreeCells(height, width)
+        self.reset()
+
+    def reset(self, seed=None):
+        # a new seed makes this game replayable on its own
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+        y = self.height // 2
+        x = self.width // 4
+        # head on the left, cells are (y, x); occupied holds the same cells for O(1) lookups
+        self.snake = deque((y, x - i) for i in range(START_LENGTH))
+        self.occupied = set(self.snake)
+        self.free_cells = self.empty_board.copy()
+        for cell in self.snake:
+            self.free_cells.take(*cell)
+        self.food = (self.height // 2, self.width // 2)
+        self.direction = RIGHT
+        self.tail = None
+        self.score = 0
+        self.ticks = 0
+        self.alive = True
+        return self
+
+    def advance(self, head):
+        # moves the snake onto head; returns 1 if it ate, else 0
+        self.ticks += 1
+        if head == self.food:
+            self.tail = None
+            self.snake.appendleft(head)
+            self.occupied.add(head)
+            self.free_cells.take(*head)
+            self.food = self.free_cells.pick(self.rng)
+            self.score += 1
+            if self.food is None:
+                # the board is full
+                self.alive = False
+            return 1
+
+        self.tail = self.snake.pop()
+        self.occupied.discard(self.tail)
+        self.free_cells.give(*self.tail)
+        self.snake.appendleft(head)
+        self.occupied.add(head)
+        self.free_cells.take(*head)
+        return 0
+
+
+
+if __name__ == "__main__":
+    env = SnakeEnv(60, 200, seed=0)
+    rng = random.Random(0)
+    ticks = 1000000
+    games = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        reward, done = env.step(rng.randrange(4) if rng.random() < 0.2 else None)
+        if done:
+            games += 1
+            env.reset()
+    elapsed = time.perf_counter() - start
+    print("{} ticks in {:.2f}s ({:.0f} ticks/s), {} games".format(ticks, elapsed, ticks / elapsed, games))
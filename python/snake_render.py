@@ -0,0 +1,62 @@
+import curses
+
+BLANK = ord(" ")
+
+
+class DiffRenderer:
+    # keeps a shadow copy of what is on the terminal; put() the cells that
+    # may have changed and flush() writes only the ones that really differ,
+    # then pushes them out with a single doupdate()
+    def __init__(self, window):
+        self.window = window
+        self.height, self.width = window.getmaxyx()
+        self.shadow = {}
+        self.pending = {}
+
+    def put(self, y, x, char):
+        self.pending[(y, x)] = char if isinstance(char, int) else ord(char)
+
+    def text(self, y, x, string):
+        for i, char in enumerate(string[:max(self.width - x, 0)]):
+            self.put(y, x + i, char)
+
+    def repaint(self):
+        # start a frame that replaces the whole screen: any cell that is
+        # not put() again before flush() gets blanked
+        self.pending = dict.fromkeys(self.shadow, BLANK)
+
+    def flush(self):
+        # returns how many cells were written
+        written = 0
+        for cell, char in self.pending.items():
+            if self.shadow.get(cell, BLANK) == char:
+                continue
+            y, x = cell
+            if 0 <= y < self.height and 0 <= x < self.width:
+                try:
+                    self.window.addch(y, x, char)
+                except curses.error:
+                    # writing the bottom-right cell moves the cursor off screen
+                    pass
+            if char == BLANK:
+                del self.shadow[cell]
+            else:
+                self.shadow[cell] = char
+            written += 1
+        self.pending.clear()
+        self.window.noutrefresh()
+        curses.doupdate()
+        return written
+
+    def clear(self):
+        # forget the shadow and start from a blank window; the caller
+        # then put()s every cell again for one full redraw
+        self.window.erase()
+        self.shadow.clear()
+        self.pending.clear()
+
+    def resize(self, height, width):
+        # after KEY_RESIZE
+        self.window.resize(height, width)
+        self.height, self.width = height, width
+        self.clear()
@@ -0,0 +1,121 @@
+import argparse
+import struct
+import time
+
+from replay_codec import check_seed, decode_runs, encode_runs
+from snake_core import MOVES, START_LENGTH, SnakeEnv
+from snake_world import SnakeWorld
+
+# a replay is a header then the direction of every tick, run-length encoded
+MAGIC = b"SNAK"
+VERSION = 1
+HEADER = struct.Struct("!4sBBIIII")     # magic, version, world?, seed, height, width, ticks
+# largest boards a replay may claim; a SnakeEnv keeps every cell of its board
+# (and snake_core caches that per size), a SnakeWorld only what is near the snake
+MAX_BOARD = 1024
+MAX_WORLD = 1 << 16
+
+
+def check_board(world, height, width):
+    largest = MAX_WORLD if world else MAX_BOARD
+    if not (3 <= height <= largest and 4 * START_LENGTH <= width <= largest):
+        raise ValueError("board is {}x{}, replays are limited to {}x{}".format(
+            height, width, largest, largest))
+
+
+class Recorder:
+    def __init__(self, env):
+        self.world = isinstance(env, SnakeWorld)
+        self.seed = check_seed(env.seed)
+        check_board(self.world, env.height, env.width)
+        self.height = env.height
+        self.width = env.width
+        self.ticks = 0
+        self.runs = []
+        self.direction = None
+        self.count = 0
+
+    def record(self, direction):
+        if direction == self.direction:
+            self.count += 1
+        else:
+            if self.count:
+                self.runs.append((self.direction, self.count))
+            self.direction = direction
+            self.count = 1
+        self.ticks += 1
+
+    def to_bytes(self):
+        runs = self.runs + ([(self.direction, self.count)] if self.count else [])
+        out = bytearray(HEADER.pack(
+            MAGIC, VERSION, self.world, self.seed, self.height, self.width, self.ticks))
+        # the direction goes in the top two bits of each run, the count below
+        return bytes(encode_runs(out, runs, 6))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+def decode(data):
+    # the header and runs, checked as far as they can be without playing
+    # the game, so a bad file is turned down before any board is built
+    if len(data) < HEADER.size:
+        raise ValueError("replay is truncated")
+    magic, version, world, seed, height, width, ticks = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a version {} snake replay".format(VERSION))
+    check_board(world, height, width)
+
+    runs = decode_runs(data, HEADER.size, 6)
+    for direction, count in runs:
+        # a run is the snake going straight, which hits a wall before this
+        if count > (height if MOVES[direction][0] else width) - 2:
+            raise ValueError("a run of {} ticks can't fit on the board".format(count))
+    if sum(count for _, count in runs) != ticks:
+        raise ValueError("replay is truncated")
+    return bool(world), seed, height, width, runs
+
+
+def simulate(data):
+    # plays a replay back; returns the final env, or raises ValueError if
+    # the game ended before the replay did or was still going after it
+    world, seed, height, width, runs = decode(data)
+    env = (SnakeWorld if world else SnakeEnv)(height, width, seed)
+    done = False
+    for direction, count in runs:
+        for _ in range(count):
+            if done:
+                raise ValueError("replay goes on after the game ended")
+            _, done = env.step(direction)
+    if not done:
+        raise ValueError("replay stops before the game ended")
+    return env
+
+
+def verify(data, score):
+    try:
+        return simulate(data).score == score
+    except ValueError:
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-simulate snake replays headlessly")
+    parser.add_argument("replays", nargs="+")
+    parser.add_argument("--score", type=int, help="check that every replay ends on this score")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for path in args.replays:
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            env = simulate(data)
+        except ValueError as e:
+            print("{}: invalid, {}".format(path, e))
+            continue
+        ok = "" if args.score is None else (" ok" if env.score == args.score else " MISMATCH")
+        print("{}: score {} in {} ticks{}".format(path, env.score, env.ticks, ok))
+    elapsed = time.perf_counter() - start
+    print("{} replays in {:.3f}s".format(len(args.replays), elapsed))
@@ -0,0 +1,149 @@
+import random
+import time
+from collections import deque
+
+from snake_core import RIGHT, START_LENGTH, SnakeRules
+
+# chunks are CHUNK x CHUNK cells; food is scattered per chunk as the snake gets near
+CHUNK = 32
+FOOD_PER_CHUNK = 3
+FOOD_RADIUS = 2
+
+
+def chunk_of(y, x):
+    return (y // CHUNK, x // CHUNK)
+
+
+class ChunkedCells:
+    # a sparse set of (y, x) cells bucketed by chunk, so memory follows the
+    # number of cells and a rectangle only looks at the chunks it overlaps
+    def __init__(self):
+        self.chunks = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, cell):
+        cells = self.chunks.get(chunk_of(*cell))
+        return cells is not None and cell in cells
+
+    def add(self, cell):
+        cells = self.chunks.setdefault(chunk_of(*cell), set())
+        if cell not in cells:
+            cells.add(cell)
+            self.size += 1
+
+    def discard(self, cell):
+        key = chunk_of(*cell)
+        cells = self.chunks.get(key)
+        if cells is not None and cell in cells:
+            cells.remove(cell)
+            self.size -= 1
+            if not cells:
+                del self.chunks[key]
+
+    def drop_chunk(self, key):
+        cells = self.chunks.pop(key, None)
+        if cells:
+            self.size -= len(cells)
+
+    def in_rect(self, top, left, height, width):
+        bottom = top + height
+        right = left + width
+        for cy in range(top // CHUNK, (bottom - 1) // CHUNK + 1):
+            for cx in range(left // CHUNK, (right - 1) // CHUNK + 1):
+                for y, x in self.chunks.get((cy, cx), ()):
+                    if top <= y < bottom and left <= x < right:
+                        yield y, x
+
+
+class SnakeWorld(SnakeRules):
+    # SnakeEnv's game on a huge board. Body and food live in ChunkedCells,
+    # food is only generated in the chunks around the head and forgotten
+    # again once the head moves away, so memory follows the snake's length
+    # rather than the size of the world. Eaten food is remembered per chunk
+    # so that coming back does not bring it back. The outermost rows and
+    # columns are walls.
+    def __init__(self, height, width, seed=None):
+        self.height = height
+        self.width = width
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.reset()
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seed = seed
+        y = self.height // 2
+        x = self.width // 2
+        self.snake = deque((y, x - i) for i in range(START_LENGTH))
+        self.occupied = ChunkedCells()
+        for cell in self.snake:
+            self.occupied.add(cell)
+        self.food = ChunkedCells()
+        self.eaten = ChunkedCells()
+        self.stocked = set()
+        self.centre = None
+        self.direction = RIGHT
+        self.tail = None
+        self.score = 0
+        self.ticks = 0
+        self.alive = True
+        self._stock_food()
+        return self
+
+    def _stock_food(self):
+        # generate food in the chunks near the head and forget the far ones;
+        # a chunk's food comes from its own seed, so it is the same every time
+        centre = chunk_of(*self.snake[0])
+        if centre == self.centre:
+            return
+        self.centre = centre
+        cy, cx = centre
+        near = {
+            (cy + dy, cx + dx)
+            for dy in range(-FOOD_RADIUS, FOOD_RADIUS + 1)
+            for dx in range(-FOOD_RADIUS, FOOD_RADIUS + 1)
+        }
+        for key in self.stocked - near:
+            self.food.drop_chunk(key)
+        for key in near - self.stocked:
+            rng = random.Random("{}:{}:{}".format(self.seed, *key))
+            for _ in range(FOOD_PER_CHUNK):
+                y = key[0] * CHUNK + rng.randrange(CHUNK)
+                x = key[1] * CHUNK + rng.randrange(CHUNK)
+                if (0 < y < self.height - 1 and 0 < x < self.width - 1
+                        and (y, x) not in self.occupied and (y, x) not in self.eaten):
+                    self.food.add((y, x))
+        self.stocked = near
+
+    def advance(self, head):
+        # moves the snake onto head; returns 1 if it ate, else 0
+        self.ticks += 1
+        ate = head in self.food
+        if ate:
+            self.food.discard(head)
+            self.eaten.add(head)
+            self.tail = None
+            self.score += 1
+        else:
+            self.tail = self.snake.pop()
+            self.occupied.discard(self.tail)
+        self.snake.appendleft(head)
+        self.occupied.add(head)
+        self._stock_food()
+        return int(ate)
+
+
+if __name__ == "__main__":
+    world = SnakeWorld(100000, 100000, seed=0)
+    rng = random.Random(0)
+    ticks = 200000
+    start = time.perf_counter()
+    for _ in range(ticks):
+        _, done = world.step(rng.choice((0, 1, 2, 3)) if rng.random() < 0.05 else None)
+        if done:
+            world.reset()
+    elapsed = time.perf_counter() - start
+    print("{} ticks in {:.2f}s ({:.0f} ticks/s), {} body cells, {} food cells in {} chunks".format(
+        ticks, elapsed, ticks / elapsed, len(world.occupied), len(world.food), len(world.food.chunks)))
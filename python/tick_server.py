@@ -0,0 +1,42 @@
+import asyncio
+import socket
+
+# unsent bytes a client may have queued before the server stops writing to it
+MAX_BACKLOG = 64 * 1024
+
+
+def no_delay(writer):
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+def backed_up(writer):
+    # a client that reads slower than the server writes would otherwise
+    # make its send buffer grow without bound
+    return writer.transport.get_write_buffer_size() > MAX_BACKLOG
+
+
+class TickServer:
+    # serves connections with handle(reader, writer) and calls tick() every
+    # interval seconds; a tick that starts late is counted in late_ticks and
+    # the schedule restarts from now instead of trying to catch up
+    interval = 1.0
+    late_ticks = 0
+
+    async def run(self, host, port, ready=None):
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready.set_result(server.sockets[0].getsockname()[1])
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        async with server:
+            while True:
+                self.tick()
+                next_tick += self.interval
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    self.late_ticks += 1
+                    next_tick = loop.time()
+                    delay = 0
+                await asyncio.sleep(delay)
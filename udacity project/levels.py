@@ -0,0 +1,404 @@
+# Story content for the four levels.
+#
+# Each level is a graph of named nodes. A node can have:
+#   text     lines printed when the node is entered
+#   score    (score key, reason) looked up in Game.SCORE_REWARDS/PENALTIES
+#   health   health change, a node that drops health to 0 kills the player
+#   prompt   question asked, with "choices" naming the node for 1, 2, ...
+#   next     node to go to straight away when there is no prompt
+#   code     the prompt asks for the treasure code, choice 1 is the right
+#            code and choice 2 anything else; "{code}" in text is replaced
+#   complete the level is won when this node is reached
+#
+# Every level starts at its "start" node.
+
+NORTH_SOUTH = "1) North 2) South\nChoose a direction (1/2): "
+SAIL = ("\nYou are now on a ship with your team and you have"
+        " to choose a direction to go.")
+STORM = {
+    "text": ["\nYou entered a huge storm and the ship broke!"],
+    "score": ("DEATH", "dying in the storm"),
+    "health": -100,
+}
+
+DEATH_ISLAND = {
+    "start": {
+        "text": [
+            "\n=== DEATH ISLAND LEVEL ===",
+            "\nYou lived in the Alexandria Governorate. "
+            "You loved to travel and discover new places. "
+            "Then the King of Egypt summoned you",
+            " and told you that he wanted you to bring him \n"
+            "1)The treasure chest,\n2)The sword of power,\n"
+            "3)The world map.\n",
+        ],
+        "prompt": "1) Do you accept the king's mission?"
+                  " 2) Do you refuse? (1/2): ",
+        "choices": ["accept", "refuse"],
+    },
+    "refuse": {
+        "text": ["\nYou refused the king mission! He imprisoned you."],
+        "score": ("MISSION_FAIL", "refusing the mission"),
+        "health": -100,
+    },
+    "accept": {
+        "text": ["\nThe King of Egypt was very happy and gave you a ship"
+                 " and arms to go on your mission."],
+        "score": ("MISSION_ACCEPT", "accepting the king's mission"),
+        "next": "sail",
+    },
+    "sail": {
+        "text": [SAIL],
+        "prompt": NORTH_SOUTH,
+        "choices": ["storm", "island"],
+    },
+    "storm": STORM,
+    "island": {
+        "text": ["\nYou see Death Island containing the treasure chest,"
+                 " guarded by Cannibals and a Giant Snake."],
+        "prompt": "Enter the island? (1)yes / 2)no): ",
+        "choices": ["snake", "avoid"],
+    },
+    "avoid": {
+        "text": ["\nYou avoided the island!"
+                 " Mission failed and the King Killed you."],
+        "score": ("MISSION_FAIL", "failing the mission"),
+        "health": -100,
+    },
+    "snake": {
+        "text": ["\nYou entered the island and must fight the Giant Snake"
+                 " who guards the island!"],
+        "prompt": "1) Fight 2) Run\nChoose an option (1/2): ",
+        "choices": ["snake_fight", "snake_run"],
+    },
+    "snake_run": {
+        "text": ["\nYou ran away! The Giant snake killed you"],
+        "score": ("DEATH", "dying while running away"),
+        "health": -100,
+    },
+    "snake_fight": {
+        "prompt": "\nWhich weapon to fight the Giant Snake?"
+                  "\n1) Sword 2) Gun\nChoose (1/2): ",
+        "choices": ["snake_sword", "snake_gun"],
+    },
+    "snake_sword": {
+        "text": ["\nThe sword had no effect! The Giant Snake killed you."],
+        "score": ("DEATH", "dying to the Giant Snake"),
+        "health": -100,
+    },
+    "snake_gun": {
+        "text": ["\nYou killed the Giant Snake!"
+                 " Now search for the treasure cave."],
+        "score": ("KILL_ENEMY", "defeating the enemy"),
+        "next": "cannibals",
+    },
+    "cannibals": {
+        "text": ["\nWhen you were searching about the treasure"
+                 " one from the Cannibals spot you and alert others!"],
+        "prompt": "1) Fight 2) Run\nChoose (1/2): ",
+        "choices": ["cannibals_fight", "cannibals_run"],
+    },
+    "cannibals_run": {
+        "text": ["\nYou ran away! Cannibals hunted you down."],
+        "score": ("DEATH", "dying while running away"),
+        "health": -100,
+    },
+    "cannibals_fight": {
+        "prompt": "\nChoose weapon:\n1) Sword 2) Gun\nChoose (1/2): ",
+        "choices": ["cannibals_sword", "cannibals_gun"],
+    },
+    "cannibals_sword": {
+        "text": ["\nSwords couldn't defeat all Cannibals! They killed you."],
+        "score": ("DEATH", "dying to Cannibals"),
+        "health": -100,
+    },
+    "cannibals_gun": {
+        "text": ["\nYou killed many Cannibals! "
+                 "Survivors tell you the treasure's location."],
+        "score": ("KILL_ENEMY", "defeating Cannibals"),
+        "next": "mountain",
+    },
+    "mountain": {
+        "text": ["They say the treasure is in a volcanic mountain."],
+        "prompt": "\n1) Climb mountain 2) Don't climb\nChoose (1/2): ",
+        "choices": ["volcano", "no_climb"],
+    },
+    "no_climb": {
+        "text": ["\nYou didn't climb. The King executed you!"],
+        "score": ("MISSION_FAIL", "failing the mission"),
+        "health": -100,
+    },
+    "volcano": {
+        "text": ["\nYou found the treasure chest! The volcano erupts!"],
+        "prompt": "1) Run 2) Throw treasure\nChoose (1/2): ",
+        "choices": ["escape", "lava"],
+    },
+    "lava": {
+        "text": ["\nYou threw the treasure into lava! You died."],
+        "score": ("DEATH", "dying in the volcano"),
+        "health": -100,
+    },
+    "escape": {
+        "text": ["\nYou escaped with the treasure!",
+                 "You are a hero you win Death island level!"],
+        "score": ("COMPLETE_LEVEL", "completing Death Island"),
+        "complete": True,
+    },
+}
+
+GHOST_SHIP = {
+    "start": {
+        "text": [
+            "\n=== GHOST SHIP LEVEL ===",
+            "\nYou are on a ghost ship! You must find the Sword of Power.",
+            SAIL,
+        ],
+        "prompt": NORTH_SOUTH,
+        "choices": ["storm", "ship"],
+    },
+    "storm": STORM,
+    "ship": {
+        "text": ["\nYou see a ghost ship that in it the Sword of Power,"
+                 " guarded by ghost pirates."],
+        "prompt": "Enter the ship? (1)yes / 2)no): ",
+        "choices": ["board", "avoid"],
+    },
+    "avoid": {
+        "text": ["\nYou avoided the ship!"
+                 " The King killed you for failing the mission."],
+        "score": ("MISSION_FAIL", "failing the mission"),
+        "health": -100,
+    },
+    "board": {
+        "text": ["\nYou entered the ship and must fight the ghost pirates!"],
+        "prompt": "1) Fight 2) Run\nChoose an option (1/2): ",
+        "choices": ["fight", "run"],
+    },
+    "run": {
+        "text": ["\nYou ran away! Ghost pirates caught you!"],
+        "score": ("DEATH", "dying while running away"),
+        "health": -100,
+    },
+    "fight": {
+        "prompt": "\nChoose weapon:\n1) Gun 2) Laser device\nChoose (1/2): ",
+        "choices": ["gun", "laser"],
+    },
+    "gun": {
+        "text": ["\nThe gun had no effect! The ghost pirates killed you."],
+        "score": ("DEATH", "dying to ghost pirates"),
+        "health": -100,
+    },
+    "laser": {
+        "text": ["\nYou killed the ghost pirates with the laser!"
+                 " Found the Sword of Power!"],
+        "score": ("KILL_ENEMY", "defeating ghost pirates"),
+        "next": "sinking",
+    },
+    "sinking": {
+        "text": ["But the ship is sinking!"],
+        "prompt": "1) Run with sword 2) Throw sword\nChoose (1/2): ",
+        "choices": ["escape", "sharks"],
+    },
+    "sharks": {
+        "text": ["\nYou threw the sword and got eaten by sharks"
+                 " while you were searching about it!"],
+        "score": ("DEATH", "dying to sharks"),
+        "health": -100,
+    },
+    "escape": {
+        "text": ["\nYou escaped with the Sword of Power!",
+                 "You completed the Ghost Ship level!"],
+        "score": ("COMPLETE_LEVEL", "completing Ghost Ship level"),
+        "complete": True,
+    },
+}
+
+BERMUDA_TRIANGLE = {
+    "start": {
+        "text": [
+            "\n=== BERMUDA TRIANGLE LEVEL ===",
+            "\nYou are in the Bermuda Triangle! You must find the World Map.",
+            SAIL,
+        ],
+        "prompt": NORTH_SOUTH,
+        "choices": ["storm", "triangle"],
+    },
+    "storm": STORM,
+    "triangle": {
+        "text": ["\nYou see the Bermuda Triangle that in it the world map,"
+                 " known as the devil's triangle."
+                 " Many who enter it never return."
+                 " It may be in it the Great Octopus."],
+        "prompt": "Enter the island? 1) No / 2) Yes: ",
+        "choices": ["avoid", "enter"],
+    },
+    "avoid": {
+        "text": ["\nYou avoided the island!"
+                 " Mission failed and the King killed you."],
+        "score": ("MISSION_FAIL", "failing the mission"),
+        "health": -100,
+    },
+    "enter": {
+        "text": ["\nYou entered the Bermuda Triangle. "
+                 "The weather turns violent with storms.",
+                 "The ship is shaking! "
+                 "You must throw things overboard to save it."],
+        "prompt": "1) Throw the treasure chest 2) Throw your arms"
+                  "\nChoose (1/2): ",
+        "choices": ["chest", "arms"],
+    },
+    "chest": {
+        "text": ["\nYou threw the treasure chest. The ship stabilizes,"
+                 " but you failed the mission!",
+                 "The King executes you for losing the treasure!"],
+        "score": ("MISSION_FAIL", "failing the mission"),
+        "health": -100,
+    },
+    "arms": {
+        "text": ["\nYou threw your arms."
+                 " The ship is safe, but now you're defenseless!",
+                 "The storm subsides, revealing the island."
+                 " You approach and encounter the Great Octopus!"],
+        "prompt": "1) Fight 2) Run\nChoose (1/2): ",
+        "choices": ["fight", "run"],
+    },
+    "run": {
+        "text": ["\nYou try to run, but the Octopus drags you under!"],
+        "score": ("DEATH", "dying while running away"),
+        "health": -100,
+    },
+    "fight": {
+        "prompt": "\nChoose a weapon: 1) Gun 2) Sword of Power"
+                  "\nChoose (1/2): ",
+        "choices": ["gun", "sword"],
+    },
+    "gun": {
+        "text": ["\nThe gun is ineffective! The Octopus kills you."],
+        "score": ("DEATH", "dying to the Great Octopus"),
+        "health": -100,
+    },
+    "sword": {
+        "text": ["\nThe Sword of Power glows! How will you activate it?"],
+        "prompt": "1) Press red button 2) Press blue button"
+                  "\nChoose (1/2): ",
+        "choices": ["red", "blue"],
+    },
+    "blue": {
+        "text": ["\nThe sword backfires, killing you!"],
+        "score": ("DEATH", "dying to the sword backfire"),
+        "health": -100,
+    },
+    "red": {
+        "text": ["\nThe sword emits a beam, killing the Octopus!"
+                 " You find the World Map in a cave."],
+        "score": ("KILL_ENEMY", "defeating the Great Octopus"),
+        "next": "cave",
+    },
+    "cave": {
+        "text": ["As you leave, rocks collapse! Choose your escape path."],
+        "prompt": "1) Left 2) Right\nChoose (1/2): ",
+        "choices": ["rocks", "escape"],
+    },
+    "rocks": {
+        "text": ["\nRocks crush you! You die."],
+        "score": ("DEATH", "dying in the cave"),
+        "health": -100,
+    },
+    "escape": {
+        "text": ["\nYou escape safely with the World Map!",
+                 "You completed the Bermuda Triangle level!"],
+        "score": ("COMPLETE_LEVEL", "completing Bermuda Triangle level"),
+        "complete": True,
+    },
+}
+
+LAND_OF_PIRATES = {
+    "start": {
+        "text": [
+            "\n=== LAND OF PIRATES LEVEL ===",
+            "\nYou are in the Land of Pirates! Find the Treasure Chest Key.",
+            "\nChoose a direction to sail:",
+        ],
+        "prompt": "1) North 2) South\nChoose (1/2): ",
+        "choices": ["storm", "island"],
+    },
+    "storm": {
+        "text": ["\nA storm destroys your ship! You die."],
+        "score": ("DEATH", "dying in the storm"),
+        "health": -100,
+    },
+    "island": {
+        "text": ["\nYou spot the Pirate King's island."
+                 " The key is with the king of the pirates"
+                 " and the pirates guard him."],
+        "prompt": "1) Avoid island 2) Land and fight\nChoose (1/2): ",
+        "choices": ["avoid", "land"],
+    },
+    "avoid": {
+        "text": ["\nThe mission failed and the king killed you!"],
+        "score": ("MISSION_FAIL", "failing the mission"),
+        "health": -100,
+    },
+    "land": {
+        "text": ["\nYou confront the Pirate King and his crew!"],
+        "prompt": "1) Fight 2) Run\nChoose (1/2): ",
+        "choices": ["fight", "run"],
+    },
+    "run": {
+        "text": ["\nThey catch you and killed you!"],
+        "score": ("DEATH", "dying while running away"),
+        "health": -100,
+    },
+    "fight": {
+        "prompt": "\nChoose weapon: 1) Gun 2) Sword of Power"
+                  "\nChoose (1/2): ",
+        "choices": ["gun", "sword"],
+    },
+    "gun": {
+        "text": ["\nYou shoot some pirates, but the King kills you!"],
+        "score": ("DEATH", "dying to the Pirate King"),
+        "health": -100,
+    },
+    "sword": {
+        "text": ["\nThe Sword of Power activates! Choose a button:"],
+        "prompt": "1) Green 2) Blue\nChoose (1/2): ",
+        "choices": ["green", "blue"],
+    },
+    "green": {
+        "text": ["\nWrong button! The sword explodes."],
+        "score": ("DEATH", "dying to the sword explosion"),
+        "health": -100,
+    },
+    "blue": {
+        "text": ["\nThe sword destroys the pirates! You take the key."],
+        "score": ("KILL_ENEMY", "defeating the Pirate King"),
+        "next": "chest",
+    },
+    "chest": {
+        "text": ["You suddenly see that the treasure chest"
+                 " needs a code to open it",
+                 "Using the world map you find the code {code}"
+                 " to open the treasure chest."],
+        "prompt": "Enter the code: ",
+        "code": True,
+        "choices": ["open", "explode"],
+    },
+    "explode": {
+        "text": ["\nIncorrect code! The chest explodes."],
+        "score": ("DEATH", "dying to the chest explosion"),
+        "health": -100,
+    },
+    "open": {
+        "text": ["\nThe chest opens",
+                 "You win the Land of Pirates level!"],
+        "score": ("COMPLETE_LEVEL", "completing Land of Pirates level"),
+        "complete": True,
+    },
+}
+
+LEVELS = {
+    "death_island": DEATH_ISLAND,
+    "ghost_ship": GHOST_SHIP,
+    "bermuda_triangle": BERMUDA_TRIANGLE,
+    "land_of_pirates": LAND_OF_PIRATES,
+}
@@ -0,0 +1,119 @@
+# Pacing for the adventure game.
+#
+# Game.level_script is a generator: a bare "yield" is a dramatic pause and
+# "choice = yield prompt, options" asks the player something. A pacer runs
+# the script, deciding what a pause costs and how questions are answered:
+#   RealTimePacer  sleeps, for people playing at a terminal
+#   InstantPacer   skips pauses, for tests and batch simulation
+#   AsyncPacer     awaits asyncio.sleep so one process can host many games
+import argparse
+import asyncio
+import contextlib
+import inspect
+import io
+import random
+import time
+
+
+class RealTimePacer:
+    def __init__(self, beat=1.0):
+        self.beat = beat
+        self.pauses = 0
+
+    def pause(self):
+        self.pauses += 1
+        time.sleep(self.beat)
+
+    def run(self, script, ask):
+        reply = None
+        try:
+            while True:
+                step = script.send(reply)
+                if step is None:
+                    self.pause()
+                    reply = None
+                else:
+                    reply = ask(*step)
+        except StopIteration as done:
+            return done.value
+
+
+class InstantPacer(RealTimePacer):
+    def __init__(self):
+        super().__init__(beat=0.0)
+
+    def pause(self):
+        self.pauses += 1
+
+
+class AsyncPacer:
+    def __init__(self, beat=1.0):
+        self.beat = beat
+        self.pauses = 0
+
+    # ask takes (prompt, options) and may be a coroutine function or a
+    # plain one, like Game.get_valid_input
+    async def run(self, script, ask):
+        reply = None
+        try:
+            while True:
+                step = script.send(reply)
+                if step is None:
+                    self.pauses += 1
+                    await asyncio.sleep(self.beat)
+                    reply = None
+                else:
+                    reply = ask(*step)
+                    if inspect.isawaitable(reply):
+                        reply = await reply
+        except StopIteration as done:
+            return done.value
+
+
+def make_pacer(beat):
+    return InstantPacer() if beat <= 0 else RealTimePacer(beat)
+
+
+# Plays whole sessions with random answers, many games at a time
+async def demo(sessions, beat, seed):
+    from game import Game
+
+    rng = random.Random(seed)
+    pacers = []
+
+    async def ask(prompt, options):
+        await asyncio.sleep(0)
+        if options is None:
+            return ""
+        return rng.choice(options)
+
+    async def session(i):
+        pacer = AsyncPacer(beat)
+        pacers.append(pacer)
+        game = Game(name=f"bot{i}", pacer=pacer)
+        await pacer.run(game.session_script(), ask)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(session(i) for i in range(sessions)))
+    return sum(p.pauses for p in pacers)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run many adventure games on one event loop."
+    )
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--beat", type=float, default=0.05,
+                        help="seconds per pause")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pauses = asyncio.run(demo(args.sessions, args.beat, args.seed))
+    wall = time.perf_counter() - start
+    print(f"{args.sessions} games, {pauses} pauses "
+          f"({pauses * args.beat:.1f}s of sleeping) in {wall:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# Plays the adventure headlessly, many times over, for balance testing.
+#
+# Bots answer every prompt the game would send to get_valid_input:
+#   random   any listed option, the treasure code right half the time
+#   greedy   never walks into a death it can see, then goes for points
+#   scripted the answers given with --script, then "2" (no / quit)
+# Games run in chunks on a process pool. Each chunk sends back a Tally
+# that is merged as it arrives, so memory does not grow with --games.
+import argparse
+import contextlib
+import json
+import multiprocessing
+import random
+import time
+from collections import Counter
+
+from game import Game
+from pacing import InstantPacer
+
+
+class Tally:
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.prompts = 0
+        self.unfinished = 0        # games stopped by --max-prompts
+        self.scores = Counter()    # final score -> games
+        self.deaths = Counter()    # "level.node" -> deaths
+        self.cleared = Counter()   # level -> games that cleared it
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins += other.wins
+        self.prompts += other.prompts
+        self.unfinished += other.unfinished
+        self.scores.update(other.scores)
+        self.deaths.update(other.deaths)
+        self.cleared.update(other.cleared)
+
+    def report(self):
+        games = self.games or 1
+        return {
+            "games": self.games,
+            "win_rate": self.wins / games,
+            "mean_score": sum(s * n for s, n in self.scores.items()) / games,
+            "prompts_per_game": self.prompts / games,
+            "unfinished": self.unfinished,
+            "scores": dict(sorted(self.scores.items())),
+            "deaths": dict(self.deaths.most_common()),
+            "cleared": {key: self.cleared[key] / games
+                        for key in Game.STORY.starts},
+        }
+
+
+# Game that notes deaths, cleared levels and wins while it plays
+class PlaytestGame(Game):
+    def __init__(self, tally, **kwargs):
+        super().__init__(**kwargs)
+        self.tally = tally
+        self.cleared = set()
+        self.won = False
+        self.script_pos = 0
+
+    def level_script(self, key):
+        result = yield from super().level_script(key)
+        if result == "complete":
+            self.cleared.add(key)
+        else:
+            self.tally.deaths[self.STORY.names[self.node]] += 1
+        return result
+
+    def give_reward(self):
+        self.won = True
+        return (yield from super().give_reward())
+
+
+def random_policy(game, rng, prompt, options):
+    if options is None:
+        return game.treasure_code if rng.random() < 0.5 else "0000"
+    return rng.choice(options)
+
+
+def greedy_policy(game, rng, prompt, options):
+    if options is None:
+        return game.treasure_code
+    if "again?" in prompt:
+        return "2" if game.won else "1"
+    story = game.STORY
+    best = max(
+        story.targets[game.node],
+        key=lambda t: (game.player_health + story.health[t] > 0,
+                       story.points[t]),
+    )
+    return str(story.targets[game.node].index(best) + 1)
+
+
+def scripted_policy(script):
+    def policy(game, rng, prompt, options):
+        if game.script_pos < len(script):
+            answer = script[game.script_pos]
+            game.script_pos += 1
+        else:
+            answer = "2"
+        if answer == "code":
+            return game.treasure_code
+        return answer
+    return policy
+
+
+class GiveUp(Exception):
+    pass
+
+
+class NullWriter:
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+# Runs one chunk of games in a worker and returns its Tally
+def play_chunk(job):
+    policy_name, script, games, seed, max_prompts = job
+    random.seed(seed)
+    rng = random.Random(seed)
+    if policy_name == "scripted":
+        policy = scripted_policy(script)
+    else:
+        policy = POLICIES[policy_name]
+    tally = Tally()
+
+    with contextlib.redirect_stdout(NullWriter()):
+        for _ in range(games):
+            game = PlaytestGame(tally, name="bot", pacer=InstantPacer())
+            asked = 0
+
+            def ask(prompt, options):
+                nonlocal asked
+                asked += 1
+                if asked > max_prompts:
+                    raise GiveUp
+                return policy(game, rng, prompt, options)
+
+            try:
+                game.pacer.run(game.session_script(), ask)
+            except GiveUp:
+                tally.unfinished += 1
+            tally.games += 1
+            tally.wins += game.won
+            tally.prompts += asked
+            tally.scores[game.score] += 1
+            for key in game.cleared:
+                tally.cleared[key] += 1
+    return tally
+
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+}
+
+
+def simulate(policy="random", games=10000, workers=None, chunk=2000,
+             seed=1, script=(), max_prompts=100000):
+    jobs = []
+    left = games
+    while left > 0:
+        size = min(chunk, left)
+        jobs.append((policy, tuple(script), size, seed + len(jobs),
+                     max_prompts))
+        left -= size
+
+    total = Tally()
+    if workers == 1:
+        for job in jobs:
+            total.merge(play_chunk(job))
+        return total
+    with multiprocessing.Pool(workers) as pool:
+        for tally in pool.imap_unordered(play_chunk, jobs):
+            total.merge(tally)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play the adventure many times with bots."
+    )
+    parser.add_argument("--policy", default="random",
+                        choices=["random", "greedy", "scripted"])
+    parser.add_argument("--script", default="",
+                        help="answers for --policy scripted, e.g. 1,2,code")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes (default: one per CPU)")
+    parser.add_argument("--chunk", type=int, default=2000,
+                        help="games per job sent to a worker")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-prompts", type=int, default=100000,
+                        help="give up on a game that asks more than this")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tally = simulate(args.policy, args.games, args.workers, args.chunk,
+                     args.seed, [a for a in args.script.split(",") if a],
+                     args.max_prompts)
+    elapsed = time.perf_counter() - start
+    report = tally.report()
+    report["seconds"] = round(elapsed, 3)
+    report["games_per_second"] = round(tally.games / elapsed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['games']} {args.policy} games in {elapsed:.2f}s "
+          f"({report['games_per_second']} games/s)")
+    print(f"win rate {report['win_rate']:.4%}  "
+          f"mean score {report['mean_score']:.1f}  "
+          f"{report['prompts_per_game']:.1f} prompts per game")
+    if report["unfinished"]:
+        print(f"{report['unfinished']} games hit --max-prompts")
+    print("\nlevels cleared at least once")
+    for key, rate in report["cleared"].items():
+        print(f"  {key:18} {rate:8.3%}")
+    print("\nfinal scores")
+    width = max(report["scores"].values())
+    for score, count in report["scores"].items():
+        bar = "#" * max(1, round(40 * count / width))
+        print(f"  {score:5} {count:9} {bar}")
+    print("\ndeath causes")
+    for cause, count in list(report["deaths"].items())[:10]:
+        print(f"  {cause:34} {count:9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Compiles the level graphs in levels.py into flat per-node lists.
+#
+# Every node gets an integer id and all of its fields live at that index,
+# so the game moves to the next node with
+#     node = story.targets[node][int(choice) - 1]
+# instead of walking nested if/elif blocks.
+
+
+class Story:
+    __slots__ = ("names", "level", "text", "points", "reason", "health",
+                 "prompt", "options", "targets", "code", "complete",
+                 "starts")
+
+    def __init__(self):
+        self.names = []     # "level.node" for messages and debugging
+        self.level = []     # level key the node belongs to
+        self.text = []      # tuple of lines
+        self.points = []    # score change, already looked up
+        self.reason = []
+        self.health = []
+        self.prompt = []    # None when the node has no question
+        self.options = []   # ("1", "2", ...) for get_valid_input
+        self.targets = []   # node ids for each option, or (next,)
+        self.code = []
+        self.complete = []
+        self.starts = {}    # level key -> id of its start node
+
+    def __len__(self):
+        return len(self.names)
+
+
+def compile_story(levels, points):
+    story = Story()
+    ids = {}
+    for key, nodes in levels.items():
+        if "start" not in nodes:
+            raise ValueError(f"level {key} has no start node")
+        for name in nodes:
+            ids[key, name] = len(ids)
+            story.names.append(f"{key}.{name}")
+        story.starts[key] = ids[key, "start"]
+
+    for key, nodes in levels.items():
+        for name, node in nodes.items():
+            where = f"{key}.{name}"
+            if "choices" in node:
+                links = node["choices"]
+                if "prompt" not in node or len(links) < 2:
+                    raise ValueError(f"{where} needs a prompt and 2+ choices")
+            elif "next" in node:
+                links = [node["next"]]
+            else:
+                links = []
+            for link in links:
+                if (key, link) not in ids:
+                    raise ValueError(f"{where} points to unknown node {link}")
+
+            score, reason = node.get("score", (None, ""))
+            if score is not None and score not in points:
+                raise ValueError(f"{where} uses unknown score {score}")
+            health = node.get("health", 0)
+            complete = node.get("complete", False)
+            if not links and not complete and health > -100:
+                raise ValueError(f"{where} is a dead end")
+
+            story.level.append(key)
+            story.text.append(tuple(node.get("text", ())))
+            story.points.append(points[score] if score else 0)
+            story.reason.append(reason)
+            story.health.append(health)
+            story.prompt.append(node.get("prompt") if "choices" in node
+                                else None)
+            story.options.append(tuple(str(i) for i in
+                                       range(1, len(links) + 1))
+                                 if "choices" in node else ())
+            story.targets.append(tuple(ids[key, link] for link in links))
+            story.code.append(node.get("code", False))
+            story.complete.append(complete)
+    return story
@@ -0,0 +1,205 @@
+# Works out every ending of the adventure without playing it.
+#
+# One try at a level is a walk down its node graph. The result of a node
+# only depends on (node, health, score), so it is memoized, which keeps
+# the work proportional to nodes times distinct scores instead of the
+# number of paths. Whole sessions (restarts, score checks, play again)
+# are a small Markov chain over level start states that is solved exactly.
+#
+# "Random play" answers every prompt 1/n, including "Play again?". The
+# treasure code prompt counts as right or wrong with even odds.
+import argparse
+import json
+import time
+from fractions import Fraction
+
+from game import Game
+
+HALF = Fraction(1, 2)
+
+
+class LevelWalk:
+    def __init__(self, story, key):
+        self.story = story
+        self.key = key
+        self.memo = {}
+        self.paths = {}
+
+    # {(kind, node, score): probability} for one try at the level
+    def outcomes(self, score=0, health=100):
+        return self.visit(self.story.starts[self.key], health, score, ())
+
+    def visit(self, node, health, score, trail):
+        state = (node, health, score)
+        if state in self.memo:
+            return self.memo[state]
+        if node in trail:
+            raise ValueError(f"loop through {self.story.names[node]}")
+        story = self.story
+        score += story.points[node]
+        health += story.health[node]
+        if health <= 0:
+            result = {("dead", node, score): Fraction(1)}
+            paths = 1
+        elif story.complete[node]:
+            result = {("complete", node, score): Fraction(1)}
+            paths = 1
+        else:
+            result = {}
+            paths = 0
+            targets = story.targets[node]
+            share = Fraction(1, len(targets))
+            for target in targets:
+                for outcome, p in self.visit(target, health, score,
+                                             trail + (node,)).items():
+                    result[outcome] = result.get(outcome, 0) + p * share
+                paths += self.paths[target, health, score]
+        self.memo[state] = result
+        self.paths[state] = paths
+        return result
+
+
+# Solves x = A x + b for every ending column, A given as {row: {col: p}}
+def solve(rows, moves, endings):
+    index = {row: i for i, row in enumerate(rows)}
+    n = len(rows)
+    width = n + len(endings)
+    matrix = []
+    for row in rows:
+        line = [Fraction(0)] * width
+        line[index[row]] += 1
+        for target, p in moves[row].items():
+            if target in index:
+                line[index[target]] -= p
+            else:
+                line[n + endings.index(target)] += p
+        matrix.append(line)
+    for col in range(n):
+        pivot = next(r for r in range(col, n) if matrix[r][col] != 0)
+        matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+        lead = matrix[col][col]
+        matrix[col] = [v / lead for v in matrix[col]]
+        for r in range(n):
+            if r != col and matrix[r][col] != 0:
+                factor = matrix[r][col]
+                matrix[r] = [a - factor * b
+                             for a, b in zip(matrix[r], matrix[col])]
+    return {row: dict(zip(endings, matrix[index[row]][n:])) for row in rows}
+
+
+def analyze(game=Game):
+    story = game.STORY
+    order = list(story.starts)
+    walks = {key: LevelWalk(story, key) for key in order}
+    bonus = game.SCORE_REWARDS["WIN_GAME"]
+
+    # Session states are (level number, score) at the start of a level.
+    # Endings are ("win", ...), ("quit", node) and ("game_over", ...).
+    moves = {}
+    scores = {}
+    todo = [(0, 0)]
+    while todo:
+        state = todo.pop()
+        if state in moves:
+            continue
+        level, start = state
+        step = {}
+
+        def add(target, p):
+            step[target] = step.get(target, 0) + p
+            if isinstance(target[0], int):
+                todo.append(target)
+
+        for (kind, node, score), p in walks[order[level]].outcomes(
+                start).items():
+            name = story.names[node]
+            if kind == "dead":
+                scores.setdefault(("quit", name), set()).add(score)
+                add(("quit", name), p * HALF)
+                add((level, 0), p * HALF)
+            elif score <= game.LOSE_SCORE:
+                scores.setdefault(("game_over", name), set()).add(score)
+                add(("game_over", name), p * HALF)
+                add((0, 0), p * HALF)
+            elif score >= game.WIN_SCORE:
+                scores.setdefault(("win", name), set()).add(score)
+                add(("win", name), p)
+            elif level + 1 == len(order):
+                ending = ("win", "all levels")
+                scores.setdefault(ending, set()).add(score + bonus)
+                add(ending, p)
+            else:
+                add((level + 1, score), p)
+        moves[state] = step
+
+    endings = sorted(scores)
+    odds = solve(list(moves), moves, endings)[0, 0]
+    finals = [s for values in scores.values() for s in values]
+    return {
+        "levels": {
+            key: {
+                "nodes": sum(1 for k in story.level if k == key),
+                "paths": walks[key].paths[story.starts[key], 100, 0],
+                "complete_chance": float(sum(
+                    p for (kind, _, _), p in walks[key].outcomes().items()
+                    if kind == "complete"
+                )),
+            }
+            for key in order
+        },
+        "session_states": len(moves),
+        "memo_states": sum(len(w.memo) for w in walks.values()),
+        "endings": [
+            {
+                "kind": kind,
+                "where": where,
+                "chance": float(odds[kind, where]),
+                "scores": sorted(scores[kind, where]),
+            }
+            for kind, where in endings
+        ],
+        "max_score": max(finals),
+        "min_score": min(finals),
+        "win_chance": float(sum(p for (kind, _), p in odds.items()
+                                if kind == "win")),
+        "lose_score_reachable": any(k == "game_over" for k, _ in endings),
+    }
+
+
+def percent(chance):
+    return f"{chance * 100:.3g}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="List every ending of the adventure and its odds."
+    )
+    parser.add_argument("--json", action="store_true",
+                        help="print the report as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = analyze()
+    report["ms"] = round((time.perf_counter() - start) * 1000, 2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for key, level in report["levels"].items():
+        print(f"{key:18} {level['nodes']:3} nodes {level['paths']:3} paths"
+              f"  {percent(level['complete_chance']):>9} cleared per try")
+    print(f"\n{'ending':8} {'where':34} {'chance':>9}  scores")
+    for ending in report["endings"]:
+        print(f"{ending['kind']:8} {ending['where']:34} "
+              f"{percent(ending['chance']):>9}  {ending['scores']}")
+    print(f"\nscore range {report['min_score']} to {report['max_score']}")
+    print(f"win chance with random answers {percent(report['win_chance'])}")
+    if not report["lose_score_reachable"]:
+        print(f"LOSE_SCORE {Game.LOSE_SCORE} can never be reached")
+    print(f"{report['session_states']} session states, "
+          f"{report['memo_states']} memoized node states, "
+          f"{report['ms']} ms")
+
+
+if __name__ == "__main__":
+    main()